@@ -1,3 +1,373 @@
-from django.test import TestCase
+import itertools
+import random
+import warnings
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from rapidfuzz.distance import Indel
+
+from etl.data_cleaner import (
+    _INSUMOS_COLS, DataCleaner, _BuscadorSubcadenas, _fechas_desde_anio_mes, _fechas_desde_serial_excel, _norm_str, _parsear_fechas,
+)
+
+
+class EstandarizacionFinalTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.cleaner = DataCleaner()
+
+    def test_fecha_faltante_queda_nat(self):
+        df = pd.DataFrame({'DEPARTAMENTO': ['CENTRAL', 'ITAPUA'], 'KIT_A': ['1', '2']})
+        final = self.cleaner.estandarizacion_final_columnas(df)
+
+        self.assertEqual(final['FECHA'].dtype, 'datetime64[ns]')
+        self.assertTrue(final['FECHA'].isna().all())
+        # Lo que usa etl_script al cargar la dimensión de tiempo
+        self.assertTrue(final['FECHA'].dt.date.isna().all())
+
+    def test_fecha_con_la_resolucion_del_esquema(self):
+        df = pd.DataFrame({'FECHA': pd.to_datetime(['2020-02-01', '2021-06-05']).as_unit('s')})
+        final = self.cleaner.estandarizacion_final_columnas(df)
+
+        self.assertEqual(final['FECHA'].dtype, 'datetime64[ns]')
+        self.assertEqual(list(final['FECHA']), [pd.Timestamp('2020-02-01'), pd.Timestamp('2021-06-05')])
+
+    def test_columnas_de_texto_categoricas(self):
+        df = pd.DataFrame({'DEPARTAMENTO': ['CENTRAL', 'SIN ESPECIFICAR'], 'DISTRITO': ['LUQUE', 'XYZ']})
+        final = self.cleaner.estandarizacion_final_columnas(df)
+
+        for col in ('LOCALIDAD', 'DISTRITO', 'DEPARTAMENTO', 'EVENTO'):
+            self.assertIsInstance(final[col].dtype, pd.CategoricalDtype)
+        # Los valores fuera del vocabulario oficial se conservan como categorías extra
+        self.assertEqual(list(final['DEPARTAMENTO']), ['CENTRAL', 'SIN ESPECIFICAR'])
+        self.assertEqual(list(final['DISTRITO']), ['LUQUE', 'XYZ'])
+
+
+class LimpiezaVectorizadaTests(SimpleTestCase):
+    """Las versiones por columna tienen que coincidir con las de un valor suelto."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.cleaner = DataCleaner()
+
+    def _comparar(self, escalar, serie, valores):
+        resultado = serie(pd.Series(valores, dtype=object))
+        for valor, obtenido in zip(valores, resultado):
+            with self.subTest(valor=valor):
+                self.assertEqual(obtenido, escalar(valor))
+
+    def test_limpiar_numero_serie(self):
+        self._comparar(self.cleaner.limpiar_numero, self.cleaner.limpiar_numero_serie, [
+            None, np.nan, float('inf'), float('-inf'), 'inf', '', '   ', '1,5', '1.5', '12',
+            ' 7 ', '-3,9', '1e3', 'abc', '1,2,3', 3.9, -2.5, 0, 42,
+        ])
+
+    def test_limpiar_numero_serie_columna_numerica(self):
+        valores = pd.Series([1.9, np.nan, np.inf, -np.inf, -0.5])
+        self.assertEqual(
+            list(self.cleaner.limpiar_numero_serie(valores)),
+            [self.cleaner.limpiar_numero(v) for v in valores],
+        )
+
+    def test_limpiar_texto_serie(self):
+        self._comparar(self.cleaner.limpiar_texto, self.cleaner.limpiar_texto_serie, [
+            None, np.nan, pd.NaT, '', '   ', '\t\n', ' asunción ', 'Luque', 'SIN ESPECIFICAR',
+            '12', 12, 3.5, 'ñemby  ',
+        ])
+
+
+class FechasTests(SimpleTestCase):
+    """Parseo de fechas con formato dominante y recuperación de seriales y AÑO/MES."""
+
+    def test_formato_dominante_con_valores_sueltos(self):
+        serie = pd.Series(['01/02/2020'] * 100 + ['2020-03-15', '5/6/2021 10:30:00', 'basura', None])
+        fechas = _parsear_fechas(serie)
+
+        self.assertTrue(pd.api.types.is_datetime64_dtype(fechas))
+        self.assertTrue((fechas.iloc[:100] == pd.Timestamp('2020-02-01')).all())
+        # Los que no siguen el formato dominante se recuperan por inferencia
+        self.assertEqual(fechas.iloc[100], pd.Timestamp('2020-03-15'))
+        self.assertEqual(fechas.iloc[101], pd.Timestamp('2021-06-05 10:30:00'))
+        self.assertTrue(fechas.iloc[102:].isna().all())
+
+    def test_sin_formato_dominante_infiere(self):
+        serie = pd.Series(['01/02/2020', '2020-03-15', '15-03-2020', None] * 5, index=range(10, 30))
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            esperado = pd.to_datetime(serie, errors='coerce', dayfirst=True)
+        pd.testing.assert_series_equal(_parsear_fechas(serie), esperado)
+
+    def test_fechas_desde_serial_excel(self):
+        valores = np.array([43831, '43831', 43831.7, ' 43832 ', '12', 500, 'abc', None, 1e9], dtype=object)
+        fechas = _fechas_desde_serial_excel(valores)
+
+        self.assertEqual(list(fechas[:4]), [np.datetime64('2020-01-01'), np.datetime64('2020-01-01'),
+                                            np.datetime64('2020-01-01'), np.datetime64('2020-01-02')])
+        # Seriales chicos, texto que no es número, nulos y fuera de rango quedan NaT
+        self.assertTrue(pd.isna(fechas[4:]).all())
+
+    def test_fechas_desde_anio_mes(self):
+        anios = np.array([2020, '2021', 2023.0, 1800, 2022, None, 'dos mil'], dtype=object)
+        meses = np.array([3, '12', '7', 5, 13, 4, 1], dtype=object)
+        fechas = _fechas_desde_anio_mes(anios, meses)
+
+        self.assertEqual(list(fechas[:3]), [np.datetime64('2020-03-01'), np.datetime64('2021-12-01'),
+                                            np.datetime64('2023-07-01')])
+        self.assertTrue(pd.isna(fechas[3:]).all())
+
+
+class ValoresUnicosTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.cleaner = DataCleaner()
+
+    def test_localidades_de_distinto_tipo_no_se_mezclan(self):
+        # 1, 1.0 y True son iguales para Python pero se limpian distinto
+        for localidades, esperado in (
+            ([1, 1.0, True], ['SIN ESPECIFICAR', '1.0', 'TRUE']),
+            ([True, 1.0, 1], ['TRUE', '1.0', 'SIN ESPECIFICAR']),
+        ):
+            with self.subTest(localidades=localidades):
+                df = pd.DataFrame({
+                    'DEPARTAMENTO': ['Central'] * 3,
+                    'DISTRITO': ['Luque'] * 3,
+                    'LOCALIDAD': pd.Series(localidades, dtype=object),
+                })
+                self.assertEqual(list(self.cleaner.normalize_locations(df)['LOCALIDAD']), esperado)
+
+    def test_muchas_columnas_sin_desborde(self):
+        # Cinco columnas de 2**16 valores distintos: una clave de base mixta sin
+        # compactar necesita 2**80 y en int64 la fila extra chocaría con la primera
+        n = 2 ** 16
+        columnas = [pd.Series(np.append(np.arange(n), 1))]
+        columnas += [pd.Series(np.append(np.arange(n), 0)) for _ in range(4)]
+
+        resultados = self.cleaner._por_valores_unicos(lambda *valores: valores, *columnas)
+
+        self.assertEqual(resultados[0], (0, 0, 0, 0, 0))
+        self.assertEqual(resultados[n], (1, 0, 0, 0, 0))
+        self.assertEqual(list(resultados), list(zip(*(c.tolist() for c in columnas))))
+
+
+class NormStrTests(SimpleTestCase):
+
+    def test_cache_distingue_tipos(self):
+        self.assertEqual(_norm_str(1.0), '1.0')
+        self.assertEqual(_norm_str(True), 'TRUE')
+        self.assertEqual(_norm_str(1), '1')
+
+    def test_marcas_fuera_del_latin_basico(self):
+        # Caracteres que no están en _ACENTOS_TABLE pasan por NFKD y la tabla de marcas
+        self.assertEqual(_norm_str('ẫ  ǆ o\u0301'), 'A DZ O')
+
+
+def _coincidencia_esperada(texto, opciones, umbral):
+    """Búsqueda original: exacta primero y luego la más parecida, ganando la primera."""
+    texto_norm = _norm_str(texto)
+    for opcion in opciones:
+        if _norm_str(opcion) == texto_norm:
+            return opcion
+    mejor, mejor_puntaje = None, 0
+    for opcion in opciones:
+        puntaje = Indel.normalized_similarity(texto_norm, _norm_str(opcion))
+        if puntaje > mejor_puntaje and puntaje >= umbral:
+            mejor, mejor_puntaje = opcion, puntaje
+    return mejor
+
+
+class MejorCoincidenciaTests(SimpleTestCase):
+    """_buscar_mejor_coincidencia y su versión por lotes (_precalcular_coincidencias)."""
+
+    # (texto, opciones, umbral, esperado)
+    CASOS = [
+        # Justo en el umbral (2·4/10 = 0.8) en el borde inferior de la ventana de longitudes
+        ('ABCDEF', ['XYZ', 'ABCD'], 0.8, 'ABCD'),
+        # Justo en el umbral (2·6/15 = 0.8) en el borde superior de la ventana
+        ('ABCDEF', ['ABCDEFXYZ', 'QQQQQQQQQQQQ'], 0.8, 'ABCDEFXYZ'),
+        # Bajo el umbral (2·3/10 = 0.6)
+        ('ABCDEF', ['ABCX', 'ZZZZZZ'], 0.8, None),
+        ('ABC', ['XYZW'], 0.7, None),
+        # Empate: gana la opción que aparece primero
+        ('ABCDEX', ['ABCDEY', 'ABCDEZ'], 0.8, 'ABCDEY'),
+        ('ABCDEX', ['ABCDEZ', 'ABCDEY'], 0.8, 'ABCDEZ'),
+        # Exacta sin importar acentos ni mayúsculas
+        ('  asuncion', ['LUQUE', 'ASUNCIÓN'], 0.8, 'ASUNCIÓN'),
+    ]
+
+    def test_busqueda_individual(self):
+        cleaner = DataCleaner()
+        for texto, opciones, umbral, esperado in self.CASOS:
+            with self.subTest(texto=texto, opciones=opciones):
+                self.assertEqual(_coincidencia_esperada(texto, opciones, umbral), esperado)
+                self.assertEqual(cleaner._buscar_mejor_coincidencia(texto, opciones, umbral=umbral), esperado)
+
+    def test_precalculo_igual_a_busqueda_individual(self):
+        cleaner = DataCleaner()
+        for texto, opciones, umbral, esperado in self.CASOS:
+            with self.subTest(texto=texto, opciones=opciones):
+                cleaner._precalcular_coincidencias({texto}, opciones, umbral)
+                self.assertEqual(cleaner._buscar_mejor_coincidencia(texto, opciones, umbral=umbral), esperado)
+
+    def test_mismo_texto_con_distintas_opciones(self):
+        cleaner = DataCleaner()
+        opciones_y, opciones_z = ['ABCDEY'], ['ABCDEZ']
+        self.assertEqual(cleaner._buscar_mejor_coincidencia('ABCDEX', opciones_y, umbral=0.8), 'ABCDEY')
+        # La cache distingue la colección de opciones: no reutiliza el resultado anterior
+        self.assertEqual(cleaner._buscar_mejor_coincidencia('ABCDEX', opciones_z, umbral=0.8), 'ABCDEZ')
+        self.assertEqual(cleaner._buscar_mejor_coincidencia('ABCDEX', opciones_y, umbral=0.8), 'ABCDEY')
+
+    def test_distritos_reales(self):
+        cleaner = DataCleaner()
+        distritos = cleaner.todos_distritos_validos
+        textos = ['ASUNCON', 'LUQE', 'SAN LORENSO', 'FERNANDO DE LA MORA ZONA NORTE', 'XX', 'CAACUPE']
+        cleaner._precalcular_coincidencias(set(textos[:3]), distritos, 0.8)
+        for texto in textos:
+            with self.subTest(texto=texto):
+                self.assertEqual(
+                    cleaner._buscar_mejor_coincidencia(texto, distritos, umbral=0.8),
+                    _coincidencia_esperada(texto, distritos, 0.8),
+                )
+
+
+def _evento_esperado(evento, departamento, insumos):
+    """Reglas originales, registro por registro, en su orden de prioridad."""
+    if evento == 'ELIMINAR_REGISTRO':
+        return 'ELIMINAR_REGISTRO'
+    if not (evento == 'SIN EVENTO' or evento == '' or evento is None):
+        return evento
+    departamento = str(departamento).upper()
+    if departamento in ['BOQUERON', 'ALTO PARAGUAY', 'PDTE. HAYES']:
+        return 'SEQUIA'
+    total_kits = insumos['KIT_A'] + insumos['KIT_B']
+    materiales = sum(v for k, v in insumos.items() if k not in ('KIT_A', 'KIT_B'))
+    if 0 < total_kits < 10 and materiales > 0:
+        return 'INCENDIO'
+    if departamento == 'CAPITAL' and total_kits > 0 and materiales == 0:
+        return 'INUNDACION'
+    if insumos['CHAPA_ZINC'] > 0 and total_kits == 0 and insumos['CHAPA_FIBROCEMENTO'] == 0:
+        return 'TORMENTA SEVERA'
+    if insumos['CHAPA_FIBROCEMENTO'] > 0 and total_kits == 0 and insumos['CHAPA_ZINC'] == 0:
+        return 'INUNDACION'
+    if total_kits > 0:
+        return 'EXTREMA VULNERABILIDAD'
+    if total_kits + materiales == 0:
+        return 'SIN_INSUMOS'
+    return 'EXTREMA VULNERABILIDAD'
+
+
+class InferenciaEventosTests(SimpleTestCase):
+    """La tabla de decisión vectorizada respeta las reglas y el orden originales."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.cleaner = DataCleaner()
+
+    def _inferir(self, registros):
+        eventos = [evento for evento, _, _ in registros]
+        departamentos = pd.Series([depto for _, depto, _ in registros], dtype=object)
+        insumos = pd.DataFrame(
+            [{col: ins.get(col, 0) for col in _INSUMOS_COLS} for _, _, ins in registros], dtype=np.int64
+        )
+        return list(self.cleaner.post_process_eventos_with_aids(eventos, departamentos, insumos))
+
+    def test_tabla_de_reglas(self):
+        # (evento, departamento, insumos, esperado)
+        casos = [
+            ('INCENDIO', 'BOQUERON', {}, 'INCENDIO'),
+            ('ELIMINAR_REGISTRO', 'CENTRAL', {'KIT_A': 5}, 'ELIMINAR_REGISTRO'),
+            ('SIN EVENTO', 'Boqueron', {'KIT_A': 3, 'COLCHONES': 1}, 'SEQUIA'),
+            ('', 'PDTE. HAYES', {}, 'SEQUIA'),
+            (None, 'CAPITAL', {'KIT_A': 3, 'COLCHONES': 1}, 'INCENDIO'),
+            ('SIN EVENTO', 'CAPITAL', {'KIT_B': 12}, 'INUNDACION'),
+            ('SIN EVENTO', 'CENTRAL', {'CHAPA_ZINC': 4, 'FRAZADAS': 2}, 'TORMENTA SEVERA'),
+            ('SIN EVENTO', 'CENTRAL', {'CHAPA_FIBROCEMENTO': 4}, 'INUNDACION'),
+            ('SIN EVENTO', 'CENTRAL', {'CHAPA_ZINC': 1, 'CHAPA_FIBROCEMENTO': 1}, 'EXTREMA VULNERABILIDAD'),
+            ('SIN EVENTO', 'CENTRAL', {'KIT_A': 12, 'COLCHONES': 1}, 'EXTREMA VULNERABILIDAD'),
+            ('SIN EVENTO', None, {}, 'SIN_INSUMOS'),
+        ]
+        obtenidos = self._inferir([(e, d, i) for e, d, i, _ in casos])
+        for (evento, depto, insumos, esperado), obtenido in zip(casos, obtenidos):
+            with self.subTest(evento=evento, departamento=depto, insumos=insumos):
+                self.assertEqual(_evento_esperado(evento, depto, {c: insumos.get(c, 0) for c in _INSUMOS_COLS}), esperado)
+                self.assertEqual(obtenido, esperado)
+
+    def test_combinaciones_iguales_a_reglas_por_registro(self):
+        registros = []
+        for evento, depto, kit_a, zinc, fibro, colchones in itertools.product(
+            ['SIN EVENTO', '', None, 'INCENDIO', 'ELIMINAR_REGISTRO'],
+            ['boqueron', 'ALTO PARAGUAY', 'CAPITAL', 'Central', None],
+            [0, 3, 12], [0, 2], [0, 2], [0, 1],
+        ):
+            insumos = {col: 0 for col in _INSUMOS_COLS}
+            insumos.update(KIT_A=kit_a, CHAPA_ZINC=zinc, CHAPA_FIBROCEMENTO=fibro, COLCHONES=colchones)
+            registros.append((evento, depto, insumos))
+
+        obtenidos = self._inferir(registros)
+        esperados = [_evento_esperado(*registro) for registro in registros]
+        self.assertEqual(obtenidos, esperados)
+
+
+class BuscadorSubcadenasTests(SimpleTestCase):
+    """Una sola regex tiene que elegir la misma clave que el recorrido en orden con `in`."""
+
+    @staticmethod
+    def _primera_contenida(claves, texto):
+        return next((clave for clave in claves if clave in texto), None)
+
+    def test_claves_superpuestas(self):
+        casos = [
+            (['AB', 'ABC', 'BCD', 'C'], ['ABCD', 'XBCDX', 'C', 'ZZ', 'ABC', '']),
+            # La que contiene a otra va primero: gana aunque la contenida también aparezca
+            (['ABC', 'AB', 'BC'], ['ABC', 'XABX', 'XBC', 'AABCC']),
+            # Apariciones superpuestas en el texto
+            (['PARAGUAY', 'ALTO PARAGUAY', 'GUAYRA'], ['ALTO PARAGUAYRA', 'PARAGUAYRA', 'GUAYRA']),
+        ]
+        for claves, textos in casos:
+            buscar = _BuscadorSubcadenas(claves)
+            for texto in textos:
+                with self.subTest(claves=claves, texto=texto):
+                    self.assertEqual(buscar(texto), self._primera_contenida(claves, texto))
+
+    def test_claves_al_azar(self):
+        azar = random.Random(0)
+        for _ in range(300):
+            claves = [''.join(azar.choices('ABC', k=azar.randint(1, 4))) for _ in range(azar.randint(1, 6))]
+            texto = ''.join(azar.choices('ABC ', k=azar.randint(0, 10)))
+            with self.subTest(claves=claves, texto=texto):
+                self.assertEqual(_BuscadorSubcadenas(claves)(texto), self._primera_contenida(claves, texto))
+
+    def test_diccionarios_del_cleaner(self):
+        cleaner = DataCleaner()
+        departamentos = list(cleaner._dept_norm_a_oficial)
+        textos = departamentos + ['ALTO PARAGUAY - CENTRAL', 'CENTRAL Y ALTO PARANA', 'PARAGUARI / ALTO PARAGUAY']
+        for texto in textos:
+            with self.subTest(texto=texto):
+                self.assertEqual(cleaner._buscar_dept_oficial(texto), self._primera_contenida(departamentos, texto))
+
+        palabras = list(cleaner.palabras_clave_eventos)
+        for texto in ['TEMPORAL INCENDIO', 'OLLA POPULAR COVID', 'CORTE IDH', 'TORMENTA E INUNDACION']:
+            with self.subTest(texto=texto):
+                self.assertEqual(cleaner._buscar_palabra_evento(texto), self._primera_contenida(palabras, texto))
+
+
+class RecargarReglasTests(SimpleTestCase):
+
+    def test_cambios_en_diccionarios(self):
+        cleaner = DataCleaner()
+        departamento = list(cleaner.departamento_orden)[3]
+        self.assertEqual(cleaner.estandarizar_departamento_robusto('ZONA QWERTY'), 'CENTRAL')
+        self.assertNotEqual(cleaner.estandarizar_evento_robusto('EVENTO QWERTY'), 'INCENDIO')
+
+        cleaner.estandarizacion_dept['ZONA QWERTY'] = departamento
+        cleaner.estandarizacion_eventos['EVENTO QWERTY'] = 'INCENDIO'
+        cleaner.recargar_reglas()
+
+        self.assertEqual(cleaner.estandarizar_departamento_robusto('zona qwerty'), departamento)
+        self.assertEqual(cleaner.estandarizar_evento_robusto('EVENTO QWERTY'), 'INCENDIO')
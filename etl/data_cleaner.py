@@ -17,22 +17,269 @@ import numpy as np
 from datetime import datetime
 import warnings
 import re
+import math
 import unicodedata
 import json
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from difflib import SequenceMatcher
-import Levenshtein
-warnings.filterwarnings('ignore')
+from rapidfuzz import process
+from rapidfuzz.distance import Indel
+
+class _TablaSinMarcas(dict):
+    """Tabla para str.translate que elimina las marcas diacríticas combinables.
+
+    Son las tildes, diéresis, etc. que quedan separadas después de la
+    descomposición NFKD. En lugar de revisar todos los caracteres Unicode al
+    importar el módulo, cada carácter se consulta la primera vez que aparece.
+    """
+
+    def __missing__(self, codigo):
+        valor = None if unicodedata.combining(chr(codigo)) else codigo
+        self[codigo] = valor
+        return valor
+
+
+_COMBINING_TABLE = _TablaSinMarcas()
+
+
+def _sin_marcas(texto):
+    return unicodedata.normalize('NFKD', texto).translate(_COMBINING_TABLE)
+
+
+# Letras latinas acentuadas (Á, Ñ, Ü, ...) ya resueltas a su forma ASCII sin
+# marcas: con un solo translate se evita la descomposición NFKD en casi todos
+# los textos. Se arma con el mismo criterio NFKD, así que el resultado no cambia
+_ACENTOS_TABLE = {
+    i: _sin_marcas(chr(i)) for i in range(0xC0, 0x250)
+    if _sin_marcas(chr(i)).isascii() and _sin_marcas(chr(i)) != chr(i)
+}
+
+# Máximo de entradas en la cache de mejores coincidencias
+_MAX_MATCH_CACHE = 100_000
+
+# Máximo de resultados recordados por cada método estandarizar_*
+_MAX_ESTANDAR_CACHE = 100_000
+# Métodos estandarizar_* que cada cleaner memoriza
+_METODOS_MEMOIZADOS = (
+    'estandarizar_departamento_robusto', 'estandarizar_distrito_robusto',
+    'estandarizar_localidad_robusta', 'estandarizar_evento_robusto',
+)
+
+# rapidfuzz convierte el score_cutoff a una distancia y puede descartar puntajes
+# que caen justo en el umbral; pedimos un corte apenas menor y validamos nosotros
+_MARGEN_CORTE = 1e-6
+
+# Filas de cada bloque de la matriz de similitud al precalcular coincidencias
+_FILAS_POR_BLOQUE = 512
+
+# Separadores con los que a veces vienen dos departamentos juntos ("CENTRAL - CAPITAL").
+# El lookahead permite encontrar apariciones superpuestas (", Y ")
+_SEPARADORES_DEPT = (' - ', ' / ', ', ', ' Y ')
+_SEPARADORES_DEPT_RE = re.compile('(?=(' + '|'.join(re.escape(s) for s in _SEPARADORES_DEPT) + '))')
+
+# Columnas de insumos, con su nombre canónico
+_INSUMOS_COLS = [
+    'KIT_A', 'KIT_B', 'CHAPA_FIBROCEMENTO', 'CHAPA_ZINC', 'COLCHONES',
+    'FRAZADAS', 'TERCIADAS', 'PUNTALES', 'CARPAS_PLASTICAS'
+]
+# Insumos que no son kits (materiales)
+_MATERIALES_COLS = [c for c in _INSUMOS_COLS if c not in ('KIT_A', 'KIT_B')]
+# Departamentos tradicionalmente secos (regla de inferencia de SEQUIA)
+_DEPTOS_SECOS = ('BOQUERON', 'ALTO PARAGUAY', 'PDTE. HAYES')
+# Textos que cuentan como ubicación vacía
+_VALORES_VACIOS = frozenset({'SIN ESPECIFICAR', ''})
+
+class _BuscadorSubcadenas:
+    """Busca varias subcadenas dentro de un texto en una sola pasada.
+
+    Equivale a recorrer las claves en orden con `clave in texto` y quedarse
+    con la primera que aparece, pero con una única expresión regular: un
+    lookahead encuentra todas las apariciones (aunque se superpongan) y luego
+    elegimos la de mayor prioridad.
+    """
+
+    def __init__(self, claves):
+        claves = list(dict.fromkeys(claves))
+        self.prioridad = {c: i for i, c in enumerate(claves)}
+        # Si una clave contiene a otra, la contenida también aparece en el texto
+        self.mejor_contenida = {
+            c: min((o for o in claves if o in c), key=self.prioridad.get) for c in claves
+        }
+        alternativas = sorted(claves, key=len, reverse=True)
+        self.patron = re.compile('(?=(' + '|'.join(re.escape(c) for c in alternativas) + '))')
+
+    def __call__(self, texto):
+        """Devuelve la primera clave (según su orden) contenida en el texto, o None."""
+        encontradas = self.patron.findall(texto)
+        if not encontradas:
+            return None
+        return min((self.mejor_contenida[c] for c in encontradas), key=self.prioridad.get)
+
+
+# Secuencias de espacios a colapsar (\s cubre también los espacios Unicode)
+_ESPACIOS_RE = re.compile(r'\s+')
+
+# Máximo de textos distintos que recordamos ya normalizados
+_MAX_NORM_CACHE = 200_000
+
+
+# typed=True porque True, 1 y 1.0 son la misma clave pero se normalizan distinto
+@lru_cache(maxsize=_MAX_NORM_CACHE, typed=True)
+def _norm_str_cacheado(s):
+    if s is None:
+        return ''
+    try:
+        s2 = str(s).upper().strip()
+        # Un texto ASCII no tiene nada que descomponer: NFKD lo deja igual
+        if not s2.isascii():
+            s2 = s2.translate(_ACENTOS_TABLE)
+            # Solo si quedan otros caracteres pasamos por la descomposición completa
+            if not s2.isascii():
+                s2 = _sin_marcas(s2)
+        s2 = _ESPACIOS_RE.sub(' ', s2)
+        return s2
+    except Exception:
+        return str(s).upper().strip()
+
+
+def _norm_str(s):
+    """Limpia un texto para comparación: quita acentos, convierte a mayúsculas y elimina espacios extra.
+
+    La normalización no depende del cleaner, así que la cache es compartida:
+    en datos sucios se repiten muy pocos textos distintos en muchas filas.
+    """
+    try:
+        return _norm_str_cacheado(s)
+    except TypeError:
+        # Valores no hashables: los normalizamos sin pasar por la cache
+        return _norm_str_cacheado.__wrapped__(s)
+
+
+# Formatos de fecha (día primero) que probamos antes de dejar que pandas adivine
+_FORMATOS_FECHA = ('%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S')
+_MUESTRA_FORMATO_FECHA = 100
+_MIN_COINCIDENCIA_FORMATO = 0.95
+
+
+def _formato_fecha_dominante(serie):
+    """Devuelve el formato conocido que siguen casi todas las fechas de texto, o None.
+
+    Solo se detecta en columnas de texto: si la muestra trae fechas ya
+    convertidas o números, pandas las trata distinto con un formato explícito.
+    """
+    muestra = serie.dropna().head(_MUESTRA_FORMATO_FECHA)
+    if muestra.empty or not all(isinstance(v, str) for v in muestra):
+        return None
+    for formato in _FORMATOS_FECHA:
+        coinciden = pd.to_datetime(muestra, format=formato, errors='coerce').notna().mean()
+        if coinciden >= _MIN_COINCIDENCIA_FORMATO:
+            return formato
+    return None
+
+
+def _parsear_fechas(serie):
+    """Convierte una columna a fechas (día primero); lo que no se entiende queda NaT.
+
+    Con un formato dominante pandas usa su camino rápido de formato fijo; los
+    textos que no lo siguen prueban los demás formatos conocidos y lo que
+    queda pasa por la inferencia. Si no hay formato dominante se infiere
+    toda la columna como siempre.
+    """
+    formato = _formato_fecha_dominante(serie)
+    if formato is None:
+        return _inferir_fechas(serie)
+    fechas = pd.to_datetime(serie, format=formato, errors='coerce')
+    es_texto = serie.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    for otro_formato in _FORMATOS_FECHA:
+        pendientes = fechas.isna().to_numpy() & es_texto
+        if not pendientes.any():
+            break
+        if otro_formato != formato:
+            fechas[pendientes] = pd.to_datetime(serie[pendientes], format=otro_formato, errors='coerce').to_numpy()
+    pendientes = (fechas.isna() & serie.notna()).to_numpy()
+    if pendientes.any():
+        fechas[pendientes] = _inferir_fechas(serie[pendientes]).to_numpy()
+    return fechas
+
+
+def _inferir_fechas(serie):
+    """Parsea infiriendo el formato (día primero); lo que no se entiende queda NaT."""
+    # La inferencia avisa cuando no hay un formato único o cuando una fecha no
+    # encaja con dayfirst; en datos cargados a mano eso es lo esperado
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        return pd.to_datetime(serie, errors='coerce', dayfirst=True)
+
+
+# Excel cuenta las fechas como días desde el 1899-12-30; más allá de
+# Timedelta.max días pandas no puede representar el desplazamiento
+_ORIGEN_EXCEL = pd.Timestamp('1899-12-30')
+_MAX_SERIAL_EXCEL = pd.Timedelta.max.days
+
+
+def _a_numeros(valores, patron_texto):
+    """Convierte una columna a float: los textos solo si cumplen `patron_texto`.
+
+    Los valores que no son texto pasan por pd.to_numeric (fechas y objetos
+    raros quedan como NaN).
+    """
+    valores = pd.Series(valores).reset_index(drop=True)
+    es_texto = valores.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    # copy=True: con copy-on-write (pandas 3) el arreglo devuelto puede ser de
+    # solo lectura, y abajo lo completamos en su lugar
+    numeros = pd.to_numeric(valores.mask(es_texto), errors='coerce').to_numpy(
+        dtype=np.float64, na_value=np.nan, copy=True
+    )
+    if es_texto.any():
+        texto = valores[es_texto].astype(str).str.strip()
+        numeros[es_texto] = pd.to_numeric(texto.where(texto.str.fullmatch(patron_texto)), errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    numeros[~np.isfinite(numeros)] = np.nan
+    return numeros
+
+
+def _fechas_desde_serial_excel(valores):
+    """Interpreta números seriales de Excel (> 1000) como fechas; el resto queda NaT.
+
+    Acepta números y textos formados solo por dígitos, igual que antes se
+    hacía valor por valor.
+    """
+    dias = _a_numeros(valores, r'\d+')
+    validos = (dias > 1000) & (dias <= _MAX_SERIAL_EXCEL)
+    dias = np.where(validos, np.trunc(dias), np.nan)
+    return pd.to_datetime(dias, unit='D', origin=_ORIGEN_EXCEL).to_numpy()
+
+
+def _fechas_desde_anio_mes(anios, meses):
+    """Arma fechas (día 1) desde columnas de año y mes; NaT si no son válidas."""
+    y = np.trunc(_a_numeros(anios, r'[+-]?\d+'))
+    m = np.trunc(_a_numeros(meses, r'[+-]?\d+'))
+    validos = (y > 1900) & (m >= 1) & (m <= 12)
+    partes = pd.DataFrame({
+        'year': np.where(validos, y, np.nan),
+        'month': np.where(validos, m, np.nan),
+        'day': 1,
+    })
+    return pd.to_datetime(partes, errors='coerce').to_numpy()
 
 
 class DataCleaner:
-    def __init__(self):
+    def __init__(self, verbose=False):
         """Prepara todas las herramientas y reglas para limpiar los datos.
         
         Aquí definimos todos los diccionarios y reglas que usaremos para 
         estandarizar la información. Es como tener un manual de instrucciones 
         para transformar datos inconsistentes en información confiable.
+
+        Con verbose=True el pipeline imprime además el diagnóstico completo
+        del estado inicial (dimensiones de calidad, muestras, estadísticas).
+
+        Los diccionarios son propios de cada cleaner y se pueden ajustar; como
+        de ellos salen índices normalizados y caches, después de modificarlos
+        hay que llamar a recargar_reglas().
         """
+        self.verbose = verbose
         
         # Campos históricos que pueden aparecer en versiones antiguas de los datos
         self.original_kit_fields = ['kit_a', 'kit_b']
@@ -176,57 +423,28 @@ class DataCleaner:
             'BOQUERON': {'FILADELFIA', 'LOMA PLATA', 'MARISCAL ESTIGARRIBIA', 'BOQUERÓN'}
             }
 
-        # Creamos un conjunto con todos los distritos válidos para búsquedas rápidas
-        self.todos_distritos_validos = set()
-        for distritos in self.DISTRITOS_POR_DEPARTAMENTO.values():
-            self.todos_distritos_validos.update(distritos)
-
-        # Mapeo de distrito a departamento para cuando solo tenemos el distrito
-        self.distrito_a_departamento = {}
-        for depto, distritos in self.DISTRITOS_POR_DEPARTAMENTO.items():
-            for distrito in distritos:
-                self.distrito_a_departamento[distrito] = depto
-
         # Diccionario para corregir nombres de distritos
         self.estandarizacion_distritos = self._construir_diccionario_distritos()
 
         # Preparamos versiones normalizadas de todos los diccionarios
         # Esto nos ayuda a comparar textos sin importar acentos o mayúsculas
-        def _norm_str(s):
-            """Limpia un texto para comparación: quita acentos, convierte a mayúsculas y elimina espacios extra."""
-            if s is None:
-                return ''
-            try:
-                s2 = str(s).upper().strip()
-                s2 = unicodedata.normalize('NFKD', s2)
-                s2 = ''.join(ch for ch in s2 if not unicodedata.combining(ch))
-                s2 = re.sub(r'\s+', ' ', s2)
-                return s2
-            except Exception:
-                return str(s).upper().strip()
-
         self._norm_str = _norm_str
 
         # Cargar datos de barrios y localidades desde JSON
         self.barrios_por_distrito = self._cargar_barrios_desde_json()
         self.todas_localidades_validas = self._preparar_localidades_validas()
 
-        
-
-        # Creamos versiones normalizadas de todos nuestros diccionarios
-        self.estandarizacion_dept_norm = {}
-        for k, v in self.estandarizacion_dept.items():
-            self.estandarizacion_dept_norm[_norm_str(k)] = v
-
-        self.distrito_a_departamento_norm = {}
-        for k, v in self.distrito_a_departamento.items():
-            self.distrito_a_departamento_norm[_norm_str(k)] = v
-
-        self.estandarizacion_distritos_norm = {}
-        for k, v in self.estandarizacion_distritos.items():
-            self.estandarizacion_distritos_norm[_norm_str(k)] = v
+        # Índice plano de todos los barrios y del distrito al que pertenecen.
+        # La lista se arma una sola vez: la cache de coincidencias la identifica por su id
+        self._todos_los_barrios = [
+            barrio for barrios in self.barrios_por_distrito.values() for barrio in barrios
+        ]
+        self._barrio_a_distrito = {
+            barrio: distrito
+            for distrito, barrios in self.barrios_por_distrito.items() for barrio in barrios
+        }
 
-        self.todos_distritos_validos_norm = {self._norm_str(d) for d in self.todos_distritos_validos}
+        
 
         # Diccionario para categorizar eventos de manera consistente
         # También marcamos qué registros deben eliminarse (como preposicionamientos)
@@ -309,8 +527,111 @@ class DataCleaner:
             'SIN EVENTO': 'SIN EVENTO'
         }
 
-        # Cache para guardar resultados de comparaciones y hacer el proceso más rápido
-        self._similitud_cache = {}
+        # Palabras clave para reconocer eventos dentro de un texto (en orden de prioridad)
+        self.palabras_clave_eventos = {
+            'COVID': 'COVID', 'INCENDIO': 'INCENDIO', 'TORMENTA': 'TORMENTA SEVERA',
+            'TEMPORAL': 'TORMENTA SEVERA', 'INUNDACION': 'INUNDACION',
+            'SEQUIA': 'SEQUIA', 'JAHO': "OPERATIVO JAHO'I", 'ÑEÑUA': "OPERATIVO JAHO'I",
+            'OLLA': 'OLLA POPULAR', 'VULNERABILIDAD': 'EXTREMA VULNERABILIDAD',
+            'CIDH': 'C.I.D.H.',
+            'Corte': 'C.I.D.H.',
+            'CORTE': 'C.I.D.H.',
+        }
+
+        # Índices y versiones normalizadas que salen de los diccionarios de arriba
+        self._preparar_indices()
+
+        # Cache de mejores coincidencias por texto normalizado y conjunto de opciones
+        self._match_cache = OrderedDict()
+        self._opciones_cache = {}
+
+        self._memoizar_estandarizar()
+
+    def _preparar_indices(self):
+        """Arma todo lo que se deriva de los diccionarios de corrección."""
+        # Creamos un conjunto con todos los distritos válidos para búsquedas rápidas
+        self.todos_distritos_validos = set()
+        for distritos in self.DISTRITOS_POR_DEPARTAMENTO.values():
+            self.todos_distritos_validos.update(distritos)
+
+        # Tipos categóricos con el vocabulario oficial de departamentos y distritos
+        # Cada celda guarda un código entero en lugar de un texto, lo que reduce memoria
+        # y hace que agrupar u ordenar por estas columnas trabaje sobre los códigos
+        self._dept_cat = pd.CategoricalDtype(list(self.departamento_orden), ordered=True)
+        self._distrito_cat = pd.CategoricalDtype(sorted(self.todos_distritos_validos))
+
+        # Orden de cada departamento según su código en _dept_cat; el último
+        # elemento (0) lo toma el código -1 de los valores fuera del vocabulario
+        self._orden_por_codigo = np.append(
+            np.array([self.departamento_orden[d] for d in self._dept_cat.categories], dtype=np.int64), 0
+        )
+
+        # Mapeo de distrito a departamento para cuando solo tenemos el distrito
+        self.distrito_a_departamento = {}
+        for depto, distritos in self.DISTRITOS_POR_DEPARTAMENTO.items():
+            for distrito in distritos:
+                self.distrito_a_departamento[distrito] = depto
+
+        # Creamos versiones normalizadas de todos nuestros diccionarios
+        self.estandarizacion_dept_norm = {}
+        for k, v in self.estandarizacion_dept.items():
+            self.estandarizacion_dept_norm[_norm_str(k)] = v
+
+        # Nombres oficiales normalizados, para buscarlos dentro de un texto
+        self._dept_norm_a_oficial = {}
+        for depto in self.departamento_orden:
+            self._dept_norm_a_oficial.setdefault(_norm_str(depto), depto)
+        self._buscar_dept_oficial = _BuscadorSubcadenas(self._dept_norm_a_oficial)
+        self._dept_oficiales_norm = frozenset(self._dept_norm_a_oficial)
+
+        self.distrito_a_departamento_norm = {}
+        for k, v in self.distrito_a_departamento.items():
+            self.distrito_a_departamento_norm[_norm_str(k)] = v
+
+        # Búsqueda directa de departamento en un solo diccionario: correcciones
+        # de departamento y, con prioridad, distritos escritos en su lugar. Las
+        # correcciones que solo repiten el nombre oficial se omiten: un texto que
+        # ya es oficial se resuelve con _dept_norm_a_oficial
+        self._dept_directo_norm = {
+            k: v for k, v in self.estandarizacion_dept_norm.items()
+            if self._dept_norm_a_oficial.get(k) != v
+        }
+        self._dept_directo_norm.update(self.distrito_a_departamento_norm)
+
+        self.estandarizacion_distritos_norm = {}
+        for k, v in self.estandarizacion_distritos.items():
+            self.estandarizacion_distritos_norm[_norm_str(k)] = v
+
+        self.todos_distritos_validos_norm = {_norm_str(d) for d in self.todos_distritos_validos}
+
+        # Palabras clave de eventos, para buscarlas dentro de un texto
+        self._buscar_palabra_evento = _BuscadorSubcadenas(self.palabras_clave_eventos)
+
+    def recargar_reglas(self):
+        """Aplica los cambios hechos a los diccionarios de este cleaner.
+
+        Los diccionarios de corrección (departamento_orden, estandarizacion_dept,
+        DISTRITOS_POR_DEPARTAMENTO, estandarizacion_distritos,
+        estandarizacion_eventos, palabras_clave_eventos) se pueden ajustar en
+        cada cleaner, pero sus versiones normalizadas y las caches se arman al
+        construirlo: después de modificarlos hay que llamar a este método.
+        """
+        self._preparar_indices()
+        self._match_cache.clear()
+        self._opciones_cache.clear()
+        for nombre in _METODOS_MEMOIZADOS:
+            getattr(self, nombre).cache_clear()
+
+    def _memoizar_estandarizar(self):
+        """Envuelve los estandarizar_* de esta instancia con una cache propia.
+
+        Solo dependen de sus argumentos y de los diccionarios del cleaner, así
+        que recordamos sus resultados para los textos repetidos. typed=True
+        porque 1 y 1.0 son iguales como clave pero se limpian distinto.
+        """
+        for nombre in _METODOS_MEMOIZADOS:
+            metodo = getattr(type(self), nombre).__get__(self)
+            setattr(self, nombre, lru_cache(maxsize=_MAX_ESTANDAR_CACHE, typed=True)(metodo))
 
     def _cargar_barrios_desde_json(self, ruta_json="barrios_por_distrito.json"):
         """Carga el archivo JSON con los barrios organizados por distrito.
@@ -519,25 +840,34 @@ class DataCleaner:
         
         return estandarizacion
 
-    def _calcular_similitud(self, texto1, texto2):
-        """Calcula qué tan parecidos son dos textos.
-        
-        Usa un algoritmo que cuenta cuántos cambios se necesitan para
-        convertir un texto en otro. Entre más bajo el número, más parecidos son.
+    def _opciones_normalizadas(self, opciones):
+        """Devuelve las opciones como lista junto con su forma normalizada.
+
+        Se calcula una sola vez por colección de opciones. También guarda la
+        primera opción para cada forma normalizada, que resuelve las
+        coincidencias exactas con un solo acceso al diccionario, y las formas
+        distintas ordenadas por longitud para acotar la búsqueda por similitud.
         """
-        key = (texto1, texto2)
-        if key in self._similitud_cache:
-            return self._similitud_cache[key]
-        
-        # Normalizamos los textos para comparar sin importar acentos o mayúsculas
-        norm1 = self._norm_str(texto1)
-        norm2 = self._norm_str(texto2)
-        
-        # Calculamos la similitud (0 , 1)
-        similitud = Levenshtein.ratio(norm1, norm2)
-        
-        self._similitud_cache[key] = similitud
-        return similitud
+        datos = self._opciones_cache.get(id(opciones))
+        if datos is None:
+            lista = list(opciones)
+            normalizadas = [self._norm_str(opcion) for opcion in lista]
+            primera_posicion = {}
+            for i, opcion_norm in enumerate(normalizadas):
+                primera_posicion.setdefault(opcion_norm, i)
+            exactas = {opcion_norm: lista[i] for opcion_norm, i in primera_posicion.items()}
+
+            # Formas distintas ordenadas por longitud, con la posición de su primera aparición
+            candidatos = sorted(primera_posicion, key=len)
+            por_longitud = (
+                np.array([len(c) for c in candidatos], dtype=np.int64),
+                candidatos,
+                np.array([primera_posicion[c] for c in candidatos], dtype=np.int64),
+            )
+            # Guardamos también la colección para que su id no pueda reutilizarse
+            datos = (opciones, lista, normalizadas, exactas, por_longitud)
+            self._opciones_cache[id(opciones)] = datos
+        return datos
 
     def _buscar_mejor_coincidencia(self, texto, opciones, umbral=0.7):
         """Encuentra la opción que más se parece al texto dado.
@@ -549,24 +879,103 @@ class DataCleaner:
             return None
         
         texto_norm = self._norm_str(texto)
+
+        # El resultado solo depende del texto normalizado, así que variantes como
+        # "Caaguazú ", "CAAGUAZU" o "caaguazu" comparten la misma entrada.
+        # Las opciones siempre son colecciones fijas del cleaner, por eso basta su id
+        key = (texto_norm, id(opciones), umbral)
+        if key in self._match_cache:
+            self._match_cache.move_to_end(key)
+            return self._match_cache[key]
         
+        _, lista, _, exactas, por_longitud = self._opciones_normalizadas(opciones)
+
         # Primero intentamos encontrar una coincidencia exacta
-        for opcion in opciones:
-            if self._norm_str(opcion) == texto_norm:
-                return opcion
-        
-        # Si no hay exacta, buscamos la más similar
-        mejor_coincidencia = None
-        mejor_puntaje = 0
+        mejor_coincidencia = exactas.get(texto_norm)
         
-        for opcion in opciones:
-            puntaje = self._calcular_similitud(texto, opcion)
-            if puntaje > mejor_puntaje and puntaje >= umbral:
-                mejor_puntaje = puntaje
-                mejor_coincidencia = opcion
+        # Si no hay exacta, buscamos la más similar. rapidfuzz calcula en C la misma
+        # medida que Levenshtein.ratio (2·LCS / (len1 + len2)); como el LCS no supera
+        # la longitud menor, solo las opciones de longitud parecida pueden llegar al
+        # umbral y descartamos el resto sin puntuarlas
+        if mejor_coincidencia is None:
+            longitudes, candidatos, posiciones = por_longitud
+            largo = len(texto_norm)
+            if umbral > 0:
+                desde = np.searchsorted(longitudes, np.floor(largo * umbral / (2 - umbral)), side='left')
+                hasta = np.searchsorted(longitudes, np.ceil(largo * (2 - umbral) / umbral), side='right')
+            else:
+                desde, hasta = 0, len(candidatos)
+
+            if hasta > desde:
+                puntajes = process.cdist(
+                    [texto_norm], candidatos[desde:hasta],
+                    scorer=Indel.normalized_similarity, score_cutoff=umbral - _MARGEN_CORTE,
+                    dtype=np.float64
+                )[0]
+                mejor_puntaje = puntajes.max()
+                # Ante un empate gana la opción que aparece primero, como en la lista original
+                if mejor_puntaje >= umbral and mejor_puntaje > 0:
+                    mejor_idx = posiciones[desde:hasta][puntajes == mejor_puntaje].min()
+                    mejor_coincidencia = lista[mejor_idx]
+
+        self._guardar_coincidencia(key, mejor_coincidencia)
         
         return mejor_coincidencia
 
+    def _guardar_coincidencia(self, key, valor):
+        """Guarda un resultado en la cache de coincidencias respetando su tamaño máximo."""
+        self._match_cache[key] = valor
+        if len(self._match_cache) > _MAX_MATCH_CACHE:
+            self._match_cache.popitem(last=False)
+
+    def _precalcular_coincidencias(self, textos, opciones, umbral):
+        """Resuelve de una sola vez la mejor coincidencia de muchos textos.
+
+        Calcula con rapidfuzz la matriz de similitud de todos los textos
+        pendientes contra las opciones (armando la tabla de bits de cada texto
+        una sola vez) y deja los resultados en la cache, de modo que las
+        llamadas posteriores a _buscar_mejor_coincidencia sean solo lecturas.
+        """
+        if not opciones:
+            return
+
+        _, _, _, exactas, _ = self._opciones_normalizadas(opciones)
+
+        pendientes = {}
+        for texto in textos:
+            if not texto:
+                continue
+            texto_norm = self._norm_str(texto)
+            key = (texto_norm, id(opciones), umbral)
+            if key in self._match_cache or key in pendientes:
+                continue
+            if texto_norm in exactas:
+                self._guardar_coincidencia(key, exactas[texto_norm])
+            else:
+                pendientes[key] = texto_norm
+
+        if not pendientes:
+            return
+
+        # Puntuamos contra las formas normalizadas distintas, en el orden de su primera
+        # aparición: así argmax se queda con la misma opción que la búsqueda individual.
+        # La matriz se arma por bloques de filas para acotar la memoria
+        candidatos = list(exactas)
+        claves = list(pendientes)
+        textos_norm = list(pendientes.values())
+        for inicio in range(0, len(claves), _FILAS_POR_BLOQUE):
+            puntajes = process.cdist(
+                textos_norm[inicio:inicio + _FILAS_POR_BLOQUE], candidatos,
+                scorer=Indel.normalized_similarity, score_cutoff=umbral - _MARGEN_CORTE,
+                dtype=np.float64, workers=-1
+            )
+            mejor_idx = puntajes.argmax(axis=1)
+            mejor_puntaje = puntajes[np.arange(len(puntajes)), mejor_idx]
+
+            for key, idx, puntaje in zip(claves[inicio:inicio + _FILAS_POR_BLOQUE], mejor_idx, mejor_puntaje):
+                valor = exactas[candidatos[idx]] if puntaje >= umbral and puntaje > 0 else None
+                self._guardar_coincidencia(key, valor)
+
     def _es_localidad_valida_en_json(self, distrito, localidad):
         """Verifica si una localidad existe exactamente en el JSON para ese distrito."""
         if not self.barrios_por_distrito:
@@ -595,20 +1004,10 @@ class DataCleaner:
         if not self.barrios_por_distrito:
             return None, None
         
-        # Recolectar todos los barrios de todos los distritos
-        todos_los_barrios = []
-        mapeo_barrio_a_distrito = {}
-        
-        for distrito, barrios in self.barrios_por_distrito.items():
-            for barrio in barrios:
-                todos_los_barrios.append(barrio)
-                mapeo_barrio_a_distrito[barrio] = distrito
-        
-        mejor_coincidencia = self._buscar_mejor_coincidencia(localidad, todos_los_barrios, umbral=umbral)
+        mejor_coincidencia = self._buscar_mejor_coincidencia(localidad, self._todos_los_barrios, umbral=umbral)
         
         if mejor_coincidencia:
-            distrito_correcto = mapeo_barrio_a_distrito.get(mejor_coincidencia)
-            return mejor_coincidencia, distrito_correcto
+            return mejor_coincidencia, self._barrio_a_distrito.get(mejor_coincidencia)
         
         return None, None
 
@@ -622,19 +1021,53 @@ class DataCleaner:
             return 'SIN ESPECIFICAR'
         return str(texto).strip().upper()
 
+    def limpiar_texto_serie(self, serie):
+        """Versión vectorizada de limpiar_texto para una columna completa.
+
+        Devuelve una serie con el mismo índice, con los textos sin espacios
+        extra, en mayúsculas y con 'SIN ESPECIFICAR' en los vacíos.
+        """
+        nulos = serie.isna().to_numpy()
+        texto = serie.astype(object).where(~nulos, '').astype(str).str.strip().str.upper()
+        return texto.mask(nulos | (texto == '').to_numpy(), 'SIN ESPECIFICAR')
+
     def limpiar_numero(self, value):
         """Convierte un valor a número entero de manera segura.
         
         Acepta números con coma o punto decimal y los convierte a enteros.
         Si no puede convertirlo, devuelve 0 en lugar de generar error.
         """
-        try:
+        if value is None:
+            return 0
+        if isinstance(value, str):
             # Aceptamos formatos como '1,5' o '1.5'
-            if isinstance(value, str):
-                value = value.replace(',', '.')
-            return int(float(value)) if value not in [None, '', np.nan] else 0
+            value = value.replace(',', '.')
+            if not value:
+                return 0
+        try:
+            numero = float(value)
         except (ValueError, TypeError):
             return 0
+        # NaN e infinitos no son cantidades válidas
+        return int(numero) if math.isfinite(numero) else 0
+
+    def limpiar_numero_serie(self, serie):
+        """Versión vectorizada de limpiar_numero para una columna completa.
+
+        Devuelve enteros (int64) con el mismo índice; lo que no se puede
+        convertir queda en 0.
+        """
+        valores = serie
+        if pd.api.types.is_object_dtype(valores) or pd.api.types.is_string_dtype(valores):
+            # Aceptamos formatos como '1,5' o '1.5' (solo en los valores de texto)
+            es_texto = valores.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+            valores = valores.to_numpy(dtype=object, copy=True)
+            if es_texto.any():
+                valores[es_texto] = pd.Series(valores[es_texto]).str.replace(',', '.', regex=False).to_numpy()
+            valores = pd.Series(valores, index=serie.index)
+        numeros = pd.to_numeric(valores, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        numeros = np.where(np.isfinite(numeros), numeros, 0)
+        return pd.Series(numeros.astype(np.int64), index=serie.index)
 
     def estandarizar_departamento_robusto(self, departamento):
         """Convierte cualquier variante de nombre de departamento al nombre oficial.
@@ -651,25 +1084,28 @@ class DataCleaner:
         depto_limpio = self.limpiar_texto(departamento)
         depto_norm = self._norm_str(depto_limpio)
 
-        # Si el usuario puso un distrito en lugar del departamento, lo corregimos
-        if depto_norm in self.distrito_a_departamento_norm:
-            return self.distrito_a_departamento_norm[depto_norm]
-
-        # 1. Busqueda directa en el diccionario de correcciones
-        if depto_norm in self.estandarizacion_dept_norm:
-            return self.estandarizacion_dept_norm[depto_norm]
-
-        # 2. Si el texto contiene separadores, probamos con la primera parte
-        for sep in [' - ', ' / ', ', ', ' Y ']:
-            if sep in depto_limpio:
-                primera_parte = depto_limpio.split(sep)[0].strip()
+        # 1. Busqueda directa en el diccionario de correcciones (si el usuario
+        # puso un distrito en lugar del departamento, también lo corregimos aquí)
+        directo = self._dept_directo_norm.get(depto_norm) or self._dept_norm_a_oficial.get(depto_norm)
+        if directo is not None:
+            return directo
+
+        # 2. Si el texto contiene separadores, probamos con la parte anterior a cada
+        # uno (en el orden de _SEPARADORES_DEPT). Una sola pasada de la expresión
+        # ubica la primera aparición de todos ellos
+        inicio_por_sep = {}
+        for m in _SEPARADORES_DEPT_RE.finditer(depto_limpio):
+            inicio_por_sep.setdefault(m.group(1), m.start())
+        for sep in _SEPARADORES_DEPT:
+            if sep in inicio_por_sep:
+                primera_parte = depto_limpio[:inicio_por_sep[sep]].strip()
                 if primera_parte in self.estandarizacion_dept:
                     return self.estandarizacion_dept[primera_parte]
 
         # 3. Buscamos nombres oficiales dentro del texto
-        for depto_estandar in self.departamento_orden.keys():
-            if self._norm_str(depto_estandar) in depto_norm:
-                return depto_estandar
+        encontrado = self._buscar_dept_oficial(depto_norm)
+        if encontrado is not None:
+            return self._dept_norm_a_oficial[encontrado]
 
         # 4. Si no logramos identificar, usamos Central por defecto
         return 'CENTRAL'
@@ -743,7 +1179,7 @@ class DataCleaner:
 
         if distrito_en_localidad:
             # Encontramos un distrito en la localidad
-            if distrito_actual in ['SIN ESPECIFICAR', '']:
+            if distrito_actual in _VALORES_VACIOS:
                 # Si el distrito está vacío, movemos el valor
                 return 'SIN ESPECIFICAR', distrito_en_localidad
             else:
@@ -783,7 +1219,7 @@ class DataCleaner:
             return correccion_local
 
         # ESTRATEGIA 3: Búsqueda global en todos los distritos
-        if localidad_limpia not in ['', 'SIN ESPECIFICAR'] and len(localidad_limpia) > 3:
+        if localidad_limpia not in _VALORES_VACIOS and len(localidad_limpia) > 3:
             correccion_global, distrito_correcto = self._buscar_localidad_en_todos_distritos(localidad_limpia, umbral=0.8)
             if correccion_global:
                 return correccion_global
@@ -817,23 +1253,31 @@ class DataCleaner:
             return self.estandarizacion_eventos[evento_limpio]
 
         # 2. Busqueda por palabras clave dentro del texto
-        palabras_clave = {
-            'COVID': 'COVID', 'INCENDIO': 'INCENDIO', 'TORMENTA': 'TORMENTA SEVERA',
-            'TEMPORAL': 'TORMENTA SEVERA', 'INUNDACION': 'INUNDACION',
-            'SEQUIA': 'SEQUIA', 'JAHO': "OPERATIVO JAHO'I", 'ÑEÑUA': "OPERATIVO JAHO'I",
-            'OLLA': 'OLLA POPULAR', 'VULNERABILIDAD': 'EXTREMA VULNERABILIDAD',
-            'CIDH': 'C.I.D.H.',
-            'Corte': 'C.I.D.H.',
-            'CORTE': 'C.I.D.H.',
-        }
-
-        for palabra, evento_estandar in palabras_clave.items():
-            if palabra in evento_limpio:
-                return evento_estandar
+        palabra = self._buscar_palabra_evento(evento_limpio)
+        if palabra is not None:
+            return self.palabras_clave_eventos[palabra]
 
         # 3. Si no coincide con nada, marcamos como sin evento
         return 'SIN EVENTO'
 
+    def _estandarizar_por_categorias(self, serie, funcion):
+        """Aplica una estandarización de valores sueltos a una columna completa.
+
+        Como categórica, la columna guarda cada texto distinto una sola vez: los
+        estandarizamos a ellos y repartimos el resultado con los códigos. El
+        código -1 (nulo) toma el último elemento, que es el resultado para nulos.
+        """
+        categorias = serie.astype('category')
+        estandar = np.append(
+            np.asarray(categorias.cat.categories.map(funcion), dtype=object),
+            funcion(None)
+        )
+        return pd.Series(estandar[categorias.cat.codes.to_numpy()], index=serie.index, name=serie.name)
+
+    def estandarizar_evento_series(self, serie):
+        """Versión vectorizada de estandarizar_evento_robusto para una columna completa."""
+        return self._estandarizar_por_categorias(serie, self.estandarizar_evento_robusto)
+
     def normalize_locations(self, df):
         """Orquesta la normalización completa de todas las columnas de ubicación.
         
@@ -852,159 +1296,189 @@ class DataCleaner:
                 df[col] = 'SIN ESPECIFICAR'
 
         print("  🗺️  Estandarizando ubicaciones...")
+
+        # Antes puntuamos juntas todas las localidades distintas contra los distritos
+        # válidos (mismo umbral que usa corregir_distrito_en_localidad en el paso 3)
+        localidad_limpia = self.limpiar_texto_serie(df['LOCALIDAD'].dropna())
+        localidades_limpias = set(pd.unique(localidad_limpia))
+        localidades_limpias.discard('SIN ESPECIFICAR')
+        self._precalcular_coincidencias(localidades_limpias, self.todos_distritos_validos, 0.8)
+        # Lo mismo contra todos los barrios, para la búsqueda global del paso 4
+        # (estandarizar_localidad_robusta solo la usa con textos de más de 3 letras)
+        self._precalcular_coincidencias(
+            {loc for loc in localidades_limpias if len(loc) > 3}, self._todos_los_barrios, 0.8
+        )
+
+        # Los cuatro pasos se aplican juntos a cada combinación distinta de
+        # departamento, distrito y localidad (los datos sucios tienen pocas), y el
+        # resultado se reparte a todas las filas de una sola vez
+        resultados = self._por_valores_unicos(
+            self._normalizar_ubicacion, df['DEPARTAMENTO'], df['DISTRITO'], df['LOCALIDAD']
+        )
+        filas = np.array(resultados.tolist(), dtype=object).reshape(len(df), 4)
+        df['DEPARTAMENTO'] = filas[:, 0]
+        df['DISTRITO'] = filas[:, 1]
+        df['LOCALIDAD'] = filas[:, 2]
+        cambios = int(filas[:, 3].sum())
+
+        # Reportamos cuántos cambios hicimos
+        if cambios > 0:
+            print(f"  ✅ Normalización de ubicaciones aplicada. Cambios realizados: {cambios}")
+        else:
+            print("  ℹ️  Normalización de ubicaciones: no se detectaron cambios relevantes.")
+
+        return df
+
+    def _normalizar_ubicacion(self, departamento, distrito, localidad):
+        """Aplica los pasos de normalize_locations a una combinación de valores.
+
+        Devuelve el departamento, distrito y localidad finales, junto con la
+        cantidad de cambios que hizo cada paso (para el reporte).
+        """
         cambios = 0
 
         # 1. Primero estandarizamos departamentos (la base geográfica)
-        if 'DEPARTAMENTO' in df.columns:
-            for idx, row in df.iterrows():
-                depto_original = row.get('DEPARTAMENTO', '')
-                depto_estandarizado = self.estandarizar_departamento_robusto(depto_original)
-                if depto_estandarizado != depto_original:
-                    df.at[idx, 'DEPARTAMENTO'] = depto_estandarizado
-                    cambios += 1
+        depto = self.estandarizar_departamento_robusto(departamento)
+        cambios += depto != departamento
 
         # 2. Luego estandarizamos distritos (con información del departamento)
-        if 'DISTRITO' in df.columns:
-            for idx, row in df.iterrows():
-                distrito_original = row.get('DISTRITO', '')
-                departamento_actual = row.get('DEPARTAMENTO', '')
-                distrito_estandarizado = self.estandarizar_distrito_robusto(
-                    distrito_original, departamento_actual
-                )
-                if distrito_estandarizado != distrito_original:
-                    df.at[idx, 'DISTRITO'] = distrito_estandarizado
-                    cambios += 1
-        
+        distrito_std = self.estandarizar_distrito_robusto(distrito, depto)
+        cambios += distrito_std != distrito
+
         # 2b. Corregimos departamentos basados en distritos estandarizados
-        for idx, row in df.iterrows():
-            distrito_actual = row.get('DISTRITO', '')
-            departamento_actual = row.get('DEPARTAMENTO', '')
-            
-            # Si el distrito es conocido, obtenemos su departamento correcto
-            distrito_norm = self._norm_str(distrito_actual)
-            if distrito_norm in self.distrito_a_departamento_norm:
-                departamento_correcto = self.distrito_a_departamento_norm[distrito_norm]
-                
-                # Si el departamento actual no coincide, lo corregimos
-                if departamento_actual != departamento_correcto:
-                    df.at[idx, 'DEPARTAMENTO'] = departamento_correcto
-                    cambios += 1
+        # Si el distrito es conocido y su departamento no coincide, lo corregimos
+        depto_correcto = self.distrito_a_departamento_norm.get(self._norm_str(distrito_std))
+        if depto_correcto is not None and depto != depto_correcto:
+            depto = depto_correcto
+            cambios += 1
 
         # 3. Detectamos y corregimos distritos en el campo de localidad
-        for idx, row in df.iterrows():
-            localidad_original = row.get('LOCALIDAD', '')
-            distrito_actual = row.get('DISTRITO', '')
-            
-            localidad_corregida, distrito_corregido = self.corregir_distrito_en_localidad(
-                localidad_original, distrito_actual
-            )
-            
-            if localidad_corregida != localidad_original:
-                df.at[idx, 'LOCALIDAD'] = localidad_corregida
-                cambios += 1
-            
-            if distrito_corregido != distrito_actual:
-                df.at[idx, 'DISTRITO'] = distrito_corregido
-                cambios += 1
+        localidad_corregida, distrito_corregido = self.corregir_distrito_en_localidad(localidad, distrito_std)
+        cambios += localidad_corregida != localidad
+        cambios += distrito_corregido != distrito_std
 
         # 4. Finalmente estandarizamos localidades (¡ahora con JSON y Levenshtein!)
-        for idx, row in df.iterrows():
-            localidad_actual = row.get('LOCALIDAD', '')
-            distrito_estandarizado = row.get('DISTRITO', '')
-            
-            localidad_estandarizada = self.estandarizar_localidad_robusta(
-                localidad_actual, distrito_estandarizado
-            )
-            
-            if localidad_estandarizada != localidad_actual:
-                df.at[idx, 'LOCALIDAD'] = localidad_estandarizada
-                cambios += 1
+        localidad_std = self.estandarizar_localidad_robusta(localidad_corregida, distrito_corregido)
+        cambios += localidad_std != localidad_corregida
 
-        # Reportamos cuántos cambios hicimos
-        if cambios > 0:
-            print(f"  ✅ Normalización de ubicaciones aplicada. Cambios realizados: {cambios}")
-        else:
-            print("  ℹ️  Normalización de ubicaciones: no se detectaron cambios relevantes.")
+        return depto, distrito_corregido, localidad_std, int(cambios)
 
-        return df
+    def _por_valores_unicos(self, funcion, *columnas):
+        """Evalúa una función una sola vez por cada combinación distinta de valores.
 
-    def post_process_eventos_with_aids(self, row):
+        Recibe una o más columnas alineadas y devuelve un arreglo con el
+        resultado correspondiente a cada fila. Los nulos se tratan como un
+        valor más, y la función los recibe tal como están en los datos.
+        """
+        codigos = np.zeros(len(columnas[0]), dtype=np.int64)
+        for columna in columnas:
+            claves = [columna]
+            if columna.dtype == object:
+                # factorize junta los valores iguales de distinto tipo (1, 1.0 y
+                # True), que las funciones limpian distinto: separamos también por tipo
+                claves.append(columna.map(type))
+            for clave in claves:
+                codigos_col, unicos_col = pd.factorize(clave, use_na_sentinel=False)
+                # Volvemos a numerar la clave combinada en cada paso para que quede
+                # por debajo de la cantidad de filas y el producto no desborde int64
+                codigos = pd.factorize(codigos * max(len(unicos_col), 1) + codigos_col)[0]
+
+        _, primeras, inversa = np.unique(codigos, return_index=True, return_inverse=True)
+        valores = [columna.to_numpy() for columna in columnas]
+
+        resultados = np.empty(len(primeras), dtype=object)
+        for k, i in enumerate(primeras):
+            resultados[k] = funcion(*(v[i] for v in valores))
+
+        return resultados[inversa.ravel()]
+
+    def post_process_eventos_with_aids(self, eventos, departamentos, insumos):
         """Infiere el tipo de evento cuando no está especificado.
         
         Usa pistas como los tipos de insumos entregados y la ubicación
-        para adivinar qué tipo de evento causó la ayuda.
+        para adivinar qué tipo de evento causó la ayuda. Trabaja sobre
+        columnas completas: recibe los eventos, los departamentos y los
+        insumos ya convertidos a enteros (ver _coerce_insumos), y devuelve
+        un arreglo con el evento final de cada registro.
         """
-        evento = row.get('EVENTO', 'SIN EVENTO')
+        eventos = np.asarray(eventos, dtype=object)
 
-        # Filtramos registros de preposicionamiento (no son ayuda real)
-        if evento == 'ELIMINAR_REGISTRO':
-            return 'ELIMINAR_REGISTRO'
+        # Los departamentos se repiten mucho: pasamos a mayúsculas cada valor
+        # distinto una sola vez y las reglas comparan por código
+        codigos, departamentos_unicos = pd.factorize(pd.Series(departamentos))
+        departamentos_unicos = pd.Series(np.asarray(departamentos_unicos, dtype=object)).astype(str).str.upper()
 
-        # Solo inferimos si no hay evento especificado
-        if evento == 'SIN EVENTO' or evento == '' or evento is None:
-            departamento = str(row.get('DEPARTAMENTO', '')).upper()
+        def _departamento_en(nombres):
+            # El código -1 (nulo) toma el último elemento, que nunca coincide
+            return np.append(departamentos_unicos.isin(nombres).to_numpy(), False)[codigos]
 
-            # REGLA 1: Departamentos tradicionalmente secos → SEQUIA
-            if departamento in ['BOQUERON', 'ALTO PARAGUAY', 'PDTE. HAYES']:
-                return 'SEQUIA'
+        # Calculamos cantidades de insumos
+        kit_b = insumos['KIT_B'].to_numpy()
+        kit_a = insumos['KIT_A'].to_numpy()
+        total_kits = kit_b + kit_a
 
-            # Calculamos cantidades de insumos
-            kit_b = self.limpiar_numero(row.get('KIT B', row.get('KIT_B', 0)))
-            kit_a = self.limpiar_numero(row.get('KIT A', row.get('KIT_A', 0)))
-            total_kits = kit_b + kit_a
+        chapa_zinc = insumos['CHAPA_ZINC'].to_numpy()
+        chapa_fibrocemento = insumos['CHAPA_FIBROCEMENTO'].to_numpy()
 
-            chapa_zinc = self.limpiar_numero(row.get('CHAPA ZINC', row.get('CHAPA_ZINC', 0)))
-            chapa_fibrocemento = self.limpiar_numero(row.get('CHAPA FIBROCEMENTO', row.get('CHAPA_FIBROCEMENTO', 0)))
+        # Sumamos materiales no kits
+        materiales = insumos[_MATERIALES_COLS].to_numpy().sum(axis=1)
+        total_insumos = total_kits + materiales
 
-            # Sumamos materiales no kits
-            materiales_no_kits_cols = [
-                'CHAPA FIBROCEMENTO', 'CHAPA_FIBROCEMENTO', 'CHAPA ZINC', 'CHAPA_ZINC',
-                'COLCHONES', 'FRAZADAS', 'TERCIADAS', 'PUNTALES', 'CARPAS PLASTICAS', 'CARPAS_PLASTICAS'
-            ]
-            materiales = sum(self.limpiar_numero(row.get(field, 0)) for field in materiales_no_kits_cols)
-            total_insumos = total_kits + materiales
+        # Solo inferimos si no hay evento especificado
+        # (los registros de preposicionamiento, ELIMINAR_REGISTRO, se mantienen)
+        sin_evento = (eventos == 'SIN EVENTO') | (eventos == '') | (eventos == None)
 
+        # Tabla de decisión: las reglas se evalúan en orden y gana la primera que se cumple
+        reglas = [
+            # Evento ya especificado → se conserva
+            (~sin_evento, eventos),
+            # REGLA 1: Departamentos tradicionalmente secos → SEQUIA
+            (_departamento_en(_DEPTOS_SECOS), 'SEQUIA'),
             # REGLA 2: Pocos kits + materiales → INCENDIO
-            if total_kits < 10 and total_kits > 0 and materiales > 0:
-                return 'INCENDIO'
-
+            ((total_kits < 10) & (total_kits > 0) & (materiales > 0), 'INCENDIO'),
             # REGLA 3: En capital, solo kits → INUNDACION
-            if departamento == 'CAPITAL' and total_kits > 0 and materiales == 0:
-                return 'INUNDACION'
-
+            (_departamento_en(['CAPITAL']) & (total_kits > 0) & (materiales == 0), 'INUNDACION'),
             # REGLA 4: Solo chapa zinc → TORMENTA SEVERA
-            if chapa_zinc > 0 and total_kits == 0 and chapa_fibrocemento == 0:
-                return 'TORMENTA SEVERA'
-
+            ((chapa_zinc > 0) & (total_kits == 0) & (chapa_fibrocemento == 0), 'TORMENTA SEVERA'),
             # REGLA 5: Solo chapa fibrocemento → INUNDACION
-            if chapa_fibrocemento > 0 and total_kits == 0 and chapa_zinc == 0:
-                return 'INUNDACION'
-
+            ((chapa_fibrocemento > 0) & (total_kits == 0) & (chapa_zinc == 0), 'INUNDACION'),
             # REGLA 6: Si hay kits → EXTREMA VULNERABILIDAD
-            if total_kits > 0:
-                return 'EXTREMA VULNERABILIDAD'
-            
+            (total_kits > 0, 'EXTREMA VULNERABILIDAD'),
             # REGLA 7: Si no tiene insumos, marcamos como sin insumos
-            if total_insumos == 0:
-                return 'SIN_INSUMOS'
-
-            # Por defecto, vulnerabilidad extrema
-            return 'EXTREMA VULNERABILIDAD'
+            (total_insumos == 0, 'SIN_INSUMOS'),
+        ]
+        # Por defecto, vulnerabilidad extrema
+        return np.select(
+            [condicion for condicion, _ in reglas],
+            [evento for _, evento in reglas],
+            default='EXTREMA VULNERABILIDAD',
+        )
 
-        return evento
+    def _coerce_insumos(self, df):
+        """Devuelve las columnas de insumos convertidas a enteros.
 
-    def run_complete_correction_pipeline(self, df):
-        """Ejecuta todo el proceso de limpieza y transformación.
-        
-        Esta es la función principal que prepara los datos para el Data Warehouse.
-        Sigue un flujo específico para garantizar que los datos estén listos
-        para ser cargados en las tablas dimensionales.
+        Las columnas quedan con su nombre canónico (por ejemplo 'KIT A' y
+        'KIT_A' se tratan como la misma) y las que faltan se completan con 0.
         """
-        print("🎯 Aplicando estandarización robusta de DEPARTAMENTO, DISTRITO, LOCALIDAD y EVENTO...")
+        disponibles = {}
+        for col in df.columns:
+            disponibles.setdefault(str(col).upper().replace(' ', '_'), col)
+
+        insumos = {}
+        for col in _INSUMOS_COLS:
+            if col in disponibles:
+                insumos[col] = self.limpiar_numero_serie(df[disponibles[col]])
+            else:
+                insumos[col] = pd.Series(0, index=df.index, dtype=np.int64)
+        return pd.DataFrame(insumos, index=df.index)
 
-        # Medimos cuántos registros tenemos al inicio
+    def _diagnostico_inicial(self, df):
+        """Imprime el estado inicial de los datos y las dimensiones de calidad.
+
+        Es solo informativo: no modifica df. Devuelve la columna de fecha ya
+        parseada (o None) para que el pipeline no tenga que volver a parsearla.
+        """
         registros_iniciales = len(df)
-        print(f"  Registros iniciales: {registros_iniciales}")
 
         # Mostrar un estado inicial con ejemplos para facilitar diagnóstico
         print("\n📊 ESTADO INICIAL:")
@@ -1014,14 +1488,43 @@ class DataCleaner:
         distr_col = next((c for c in df.columns if 'DISTRIT' in c.upper()), None)
         loc_col = next((c for c in df.columns if 'LOCALID' in c.upper()), None)
 
+        # Máscara de "valor presente y no vacío" por columna. Varios diagnósticos la
+        # usan, así que cada columna se recorre una sola vez
+        mascaras_no_vacias = {}
+        fechas_parseadas = None
+        anios_parseados = None
+        fechas_fuera_de_rango = None
+
+        def _no_vacio(col):
+            if col not in mascaras_no_vacias:
+                serie = df[col]
+                mascaras_no_vacias[col] = serie.notna() & (serie.astype(str).str.strip() != '')
+            return mascaras_no_vacias[col]
+
+        # Total de insumos por fila con los valores tal como entran (lo no numérico
+        # cuenta 0). Lo usan el análisis exploratorio y la dimensión de Validez
+        totales_insumos = {}
+
+        def _total_insumos(cols):
+            clave = tuple(cols)
+            if clave not in totales_insumos:
+                matriz = np.column_stack([pd.to_numeric(df[c], errors='coerce').fillna(0).to_numpy() for c in cols])
+                totales_insumos[clave] = pd.Series(matriz.sum(axis=1), index=df.index)
+            return totales_insumos[clave]
+
         try:
 
             # Mostrar distribución inicial por AÑO (si hay columna de fecha)
             date_col = next((c for c in df.columns if 'FECHA' in c.upper()), None)
+            # La columna de fecha se parsea una sola vez y se reutiliza en todos los
+            # diagnósticos y en feature_engineering_basico
             if date_col is not None:
                 try:
-                    parsed_dates = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True, infer_datetime_format=True)
-                    year_series = parsed_dates.dt.year.dropna().astype(int)
+                    fechas_parseadas = _parsear_fechas(df[date_col])
+                    # El año y la regla 2018-2023 también se calculan una sola vez
+                    anios_parseados = fechas_parseadas.dt.year
+                    fechas_fuera_de_rango = ~((anios_parseados >= 2018) & (anios_parseados <= 2023)).to_numpy()
+                    year_series = anios_parseados.dropna().astype(int)
                     year_counts = year_series.value_counts().sort_index()
                     total_years = int(year_counts.sum()) if len(year_counts) > 0 else 0
                     if total_years > 0:
@@ -1051,9 +1554,7 @@ class DataCleaner:
 
                 print(f"{'Campo':<12}{'Valores Completos':>18}{'Valores Faltantes':>20}{'% Completitud':>16}")
                 for label, colname in mapped_cols:
-                    serie = df[colname]
-                    completos_mask = serie.notna() & (serie.astype(str).str.strip() != '')
-                    completos = int(completos_mask.sum())
+                    completos = int(_no_vacio(colname).sum())
                     faltantes = int(registros_iniciales - completos)
                     pct_comp = completos / registros_iniciales * 100 if registros_iniciales > 0 else 0
                     print(f"{label:<12}{completos:18,}{faltantes:20,}{pct_comp:16.1f}%")
@@ -1061,35 +1562,17 @@ class DataCleaner:
                 print("⚠️ Error calculando completitud por columna (diagnóstico inicial).")
 
             # Ahora imprimimos los recuentos y ejemplos por entidad (Departamentos, Eventos, Distritos, Localidades)
-            if dept_col is not None:
-                try:
-                    dept_counts = df[dept_col].fillna('SIN ESPECIFICAR').astype(str).value_counts(dropna=False)
-                    print(f"\n  Departamentos iniciales: {len(dept_counts)}")
-                    print(f"  Ejemplos: {dept_counts.head(5).to_dict()}")
-                except Exception:
-                    pass
-
-            if distr_col is not None:
-                try:
-                    distr_counts = df[distr_col].fillna('SIN ESPECIFICAR').astype(str).value_counts(dropna=False)
-                    print(f"  Distritos iniciales: {len(distr_counts)}")
-                    print(f"  Ejemplos: {distr_counts.head(5).to_dict()}")
-                except Exception:
-                    pass
-
-            if loc_col is not None:
-                try:
-                    loc_counts = df[loc_col].fillna('SIN ESPECIFICAR').astype(str).value_counts(dropna=False)
-                    print(f"  Localidades iniciales: {len(loc_counts)}")
-                    print(f"  Ejemplos: {loc_counts.head(5).to_dict()}")
-                except Exception:
-                    pass
-
-            if evento_col is not None:
+            entidades = [
+                ('\n  Departamentos', dept_col), ('  Distritos', distr_col),
+                ('  Localidades', loc_col), ('  Eventos', evento_col),
+            ]
+            for etiqueta, col in entidades:
+                if col is None:
+                    continue
                 try:
-                    evento_counts = df[evento_col].fillna('SIN ESPECIFICAR').astype(str).value_counts(dropna=False)
-                    print(f"  Eventos iniciales: {len(evento_counts)}")
-                    print(f"  Ejemplos: {evento_counts.head(5).to_dict()}")
+                    conteos = df[col].fillna('SIN ESPECIFICAR').astype(str).value_counts(dropna=False)
+                    print(f"{etiqueta} iniciales: {len(conteos)}")
+                    print(f"  Ejemplos: {conteos.head(5).to_dict()}")
                 except Exception:
                     pass
 
@@ -1105,8 +1588,7 @@ class DataCleaner:
 
             # Construir serie de total de insumos por fila (manejo flexible de tipos)
             if insumo_cols:
-                df_insumos_numeric = df[insumo_cols].apply(lambda s: pd.to_numeric(s, errors='coerce').fillna(0))
-                total_insumos = df_insumos_numeric.sum(axis=1)
+                total_insumos = _total_insumos(insumo_cols)
 
                 # Estadísticas descriptivas
                 media = total_insumos.mean()
@@ -1132,7 +1614,7 @@ class DataCleaner:
                     dept_val = df.at[idx, dept_col] if dept_col in df.columns else 'SIN_DEPARTAMENTO'
                     fecha_raw = df.at[idx, date_col] if date_col in df.columns else None
                     try:
-                        fecha_fmt = pd.to_datetime(fecha_raw, errors='coerce', dayfirst=True)
+                        fecha_fmt = fechas_parseadas.at[idx] if fechas_parseadas is not None else pd.NaT
                         fecha_str = fecha_fmt.strftime('%m/%Y') if not pd.isna(fecha_fmt) else str(fecha_raw)
                     except Exception:
                         fecha_str = str(fecha_raw)
@@ -1140,9 +1622,8 @@ class DataCleaner:
 
                 # Agregado por año (usar parsed dates si están disponibles)
                 try:
-                    if date_col in df.columns:
-                        parsed_dates = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True)
-                        df_year = pd.DataFrame({'year': parsed_dates.dt.year, 'total_insumos': total_insumos})
+                    if anios_parseados is not None:
+                        df_year = pd.DataFrame({'year': anios_parseados, 'total_insumos': total_insumos})
                         df_year = df_year[df_year['year'].notna()]
                         if not df_year.empty:
                             print("\nExploración Temporal Inicial")
@@ -1162,10 +1643,10 @@ class DataCleaner:
                     mandatory_cols = [c for c in mandatory_cols if c is not None]
                     mask_all = pd.Series(True, index=df.index)
                     for c in mandatory_cols:
-                        mask_all &= df[c].notna() & (df[c].astype(str).str.strip() != '')
+                        mask_all &= _no_vacio(c)
                     pct_all_fields = mask_all.sum() / registros_iniciales * 100 if registros_iniciales > 0 else 0
 
-                    mask_date_loc = df[date_col].notna() & ((df[dept_col].notna() & (df[dept_col].astype(str).str.strip() != '')) | (df[distr_col].notna() & (df[distr_col].astype(str).str.strip() != '')))
+                    mask_date_loc = df[date_col].notna() & (_no_vacio(dept_col) | _no_vacio(distr_col))
                     pct_date_loc = mask_date_loc.sum() / registros_iniciales * 100 if registros_iniciales > 0 else 0
 
                     pct_insumos_gt0 = (total_insumos > 0).sum() / registros_iniciales * 100 if registros_iniciales > 0 else 0
@@ -1201,21 +1682,28 @@ class DataCleaner:
                     mismatches_samples = []
                     # Consideramos solo filas donde ambos campos están presentes y no vacíos
                     if dept_col in df.columns and distr_col in df.columns:
-                        mask_both = df[dept_col].notna() & df[distr_col].notna() & (df[dept_col].astype(str).str.strip() != '') & (df[distr_col].astype(str).str.strip() != '')
+                        mask_both = _no_vacio(dept_col) & _no_vacio(distr_col)
                         rows_with_both = int(mask_both.sum())
                         if rows_with_both > 0:
-                            for idx, row in df.loc[mask_both, [dept_col, distr_col]].iterrows():
-                                d_actual = row.get(distr_col, '')
-                                dept_actual = row.get(dept_col, '')
-                                d_norm = self._norm_str(d_actual)
+                            def _depto_esperado_si_inconsistente(dept_actual, d_actual):
                                 # buscamos el departamento oficial asignado al distrito (si existe)
-                                mapped_dept = self.distrito_a_departamento_norm.get(d_norm)
-                                if mapped_dept:
-                                    if self._norm_str(dept_actual) != self._norm_str(mapped_dept):
-                                        mismatch_count += 1
-                                        # guardamos una muestra para diagnóstico
-                                        if len(mismatches_samples) < 5:
-                                            mismatches_samples.append((idx, d_actual, dept_actual, mapped_dept))
+                                mapped_dept = self.distrito_a_departamento_norm.get(self._norm_str(d_actual))
+                                if mapped_dept and self._norm_str(dept_actual) != self._norm_str(mapped_dept):
+                                    return mapped_dept
+                                return None
+
+                            # Evaluamos una sola vez cada par distinto (departamento, distrito)
+                            ambos = df.loc[mask_both, [dept_col, distr_col]]
+                            esperados = self._por_valores_unicos(
+                                _depto_esperado_si_inconsistente, ambos[dept_col], ambos[distr_col]
+                            )
+                            inconsistentes = np.flatnonzero(pd.notna(esperados))
+                            mismatch_count = len(inconsistentes)
+                            # guardamos una muestra para diagnóstico
+                            for pos in inconsistentes[:5]:
+                                mismatches_samples.append(
+                                    (ambos.index[pos], ambos[distr_col].iat[pos], ambos[dept_col].iat[pos], esperados[pos])
+                                )
                     else:
                         rows_with_both = 0
 
@@ -1232,9 +1720,7 @@ class DataCleaner:
                     # Añadimos aquí la regla de fecha como parte de la dimensión de consistencia
                     try:
                         if date_col in df.columns:
-                            parsed_dates_local = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True, infer_datetime_format=True)
-                            valid_year_mask_local = (parsed_dates_local.dt.year >= 2018) & (parsed_dates_local.dt.year <= 2023)
-                            fecha_bad_count_local = int((~valid_year_mask_local).sum())
+                            fecha_bad_count_local = int(fechas_fuera_de_rango.sum())
                             pct_fecha_ok_local = (registros_iniciales - fecha_bad_count_local) / registros_iniciales * 100 if registros_iniciales > 0 else 0
                             print(f"Fecha debe estar en rango 2018-2023 -> {pct_fecha_ok_local:.1f}% -> {fecha_bad_count_local:,} ({(100-pct_fecha_ok_local):.1f}% incumplen)")
                     except Exception:
@@ -1242,47 +1728,6 @@ class DataCleaner:
                 except Exception:
                     pass
 
-                    if date_col in df.columns:
-                        parsed = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True, infer_datetime_format=True)
-                        # intentamos recuperar fechas inválidas (serial Excel y AÑO/MES)
-                        def try_excel_serial_local(val):
-                            try:
-                                if pd.isna(val):
-                                    return None
-                                if isinstance(val, (int, float)) and val > 1000:
-                                    return (pd.to_datetime('1899-12-30') + pd.to_timedelta(int(val), unit='D'))
-                                if isinstance(val, str) and re.fullmatch(r"\d+", val.strip()):
-                                    iv = int(val.strip())
-                                    if iv > 1000:
-                                        return (pd.to_datetime('1899-12-30') + pd.to_timedelta(iv, unit='D'))
-                            except Exception:
-                                return None
-                            return None
-
-                        parsed_after = parsed.copy()
-                        mask_nat = parsed_after.isna()
-                        if mask_nat.any():
-                            for idx in df[mask_nat].index:
-                                orig = df.at[idx, date_col]
-                                alt = try_excel_serial_local(orig)
-                                if alt is not None:
-                                    parsed_after.at[idx] = alt
-
-                        # Intentar reconstruir desde AÑO/MES si sigue faltando
-                        mask_nat = parsed_after.isna()
-                        year_cols = [c for c in df.columns if c.upper() in ('AÑO', 'ANO', 'ANIO', 'YEAR')]
-                        month_cols = [c for c in df.columns if c.upper() in ('MES', 'MONTH', 'MES_NOMBRE')]
-                        if mask_nat.any() and year_cols and month_cols:
-                            for idx in df[mask_nat].index:
-                                try:
-                                    y = int(df.at[idx, year_cols[0]])
-                                    m = int(df.at[idx, month_cols[0]])
-                                    if y > 1900 and 1 <= m <= 12:
-                                        parsed_after.at[idx] = pd.Timestamp(year=y, month=m, day=1)
-                                except Exception:
-                                    continue
-                    pass
-
         except Exception:
             # no romper el pipeline si hay algún fallo en este bloque analítico
             pass
@@ -1293,7 +1738,7 @@ class DataCleaner:
             insumo_keywords_init = ['KIT', 'CHAPA', 'COLCHON', 'COLCHONES', 'FRAZ', 'TERCIAD', 'PUNTA', 'CARPA']
             insumo_cols_init = [c for c in df.columns if any(k in c.upper() for k in insumo_keywords_init)]
             if insumo_cols_init:
-                total_insumos_init = df[insumo_cols_init].apply(lambda s: pd.to_numeric(s, errors='coerce').fillna(0)).sum(axis=1)
+                total_insumos_init = _total_insumos(insumo_cols_init)
             else:
                 total_insumos_init = pd.Series(0, index=df.index)
 
@@ -1303,14 +1748,15 @@ class DataCleaner:
 
             # 2) Regla: departamento debe ser uno de los oficiales
             dept_valid_count = 0
-            dept_official_norm = {self._norm_str(k) for k in self.departamento_orden.keys()}
+            dept_official_norm = self._dept_oficiales_norm
             if dept_col in df.columns:
                 # máscara de filas con valor no vacío
-                non_empty_mask = df[dept_col].notna() & (df[dept_col].astype(str).str.strip() != '')
+                non_empty_mask = _no_vacio(dept_col)
                 # para cada valor no vacío verificamos si su forma normalizada está en la lista oficial
                 try:
-                    dept_norm_series = df.loc[non_empty_mask, dept_col].astype(str).apply(self._norm_str)
-                    dept_valid_count = int(dept_norm_series.isin(dept_official_norm).sum())
+                    # pocos departamentos distintos: normalizamos cada uno una sola vez
+                    dept_norm = self._por_valores_unicos(self._norm_str, df.loc[non_empty_mask, dept_col].astype(str))
+                    dept_valid_count = int(pd.Series(dept_norm, dtype=object).isin(dept_official_norm).sum())
                 except Exception:
                     # fallback conservador: contar 0 válidos si algo falla
                     dept_valid_count = 0
@@ -1320,9 +1766,7 @@ class DataCleaner:
             # 3) Regla: fecha debe estar en rango 2018-2023
             fecha_bad_count = 0
             if date_col is not None:
-                parsed_init = pd.to_datetime(df[date_col], errors='coerce', dayfirst=True, infer_datetime_format=True)
-                valid_year_mask = (parsed_init.dt.year >= 2018) & (parsed_init.dt.year <= 2023)
-                fecha_bad_count = int((~valid_year_mask).sum())
+                fecha_bad_count = int(fechas_fuera_de_rango.sum())
             pct_fecha_ok = (registros_iniciales - fecha_bad_count) / registros_iniciales * 100 if registros_iniciales > 0 else 0
 
             # 4) Regla: evento no puede estar vacío
@@ -1353,9 +1797,8 @@ class DataCleaner:
                             print(sample_no_insumos.to_string(index=True))
                         except Exception:
                             # fallback sencillo línea a línea
-                            for i, row in sample_no_insumos.iterrows():
-                                vals = [str(row[c]) for c in cols_show]
-                                print(f"- {i}: {' | '.join(vals)}")
+                            for i, *vals in sample_no_insumos.itertuples(index=True, name=None):
+                                print(f"- {i}: {' | '.join(str(v) for v in vals)}")
                     else:
                         print("\nNo se encontraron registros sin insumos en la vista inicial.")
                 else:
@@ -1372,101 +1815,103 @@ class DataCleaner:
         except Exception:
             pass
 
-        # Normalizamos nombres de columnas para consistencia
+        return fechas_parseadas
+
+    def run_complete_correction_pipeline(self, df):
+        """Ejecuta todo el proceso de limpieza y transformación.
+        
+        Esta es la función principal que prepara los datos para el Data Warehouse.
+        Sigue un flujo específico para garantizar que los datos estén listos
+        para ser cargados en las tablas dimensionales.
+        """
+        print("🎯 Aplicando estandarización robusta de DEPARTAMENTO, DISTRITO, LOCALIDAD y EVENTO...")
+
+        # Medimos cuántos registros tenemos al inicio
+        registros_iniciales = len(df)
+        print(f"  Registros iniciales: {registros_iniciales}")
+
+        # Diagnóstico del estado inicial: solo con salida detallada, no modifica df
+        fechas_parseadas = None
+        if self.verbose:
+            fechas_parseadas = self._diagnostico_inicial(df)
+
+        # Normalizamos nombres de columnas para consistencia (son pocos
+        # encabezados: la lista por comprensión es más directa que Index.str)
         df.columns = [col.upper().replace(' ', '_') for col in df.columns]
 
         # 1. Normalizamos todas las ubicaciones (¡ahora mejorada con JSON!)
         df = self.normalize_locations(df)
 
-        # 2. Estandarizamos eventos (antes de inferir)
+        # 2. Estandarizamos eventos (antes de inferir), una vez por texto distinto
         if 'EVENTO' in df.columns:
-            df['EVENTO'] = df['EVENTO'].apply(self.estandarizar_evento_robusto)
+            df['EVENTO'] = self.estandarizar_evento_series(df['EVENTO']).to_numpy()
 
         # 3. Inferimos eventos cuando no están especificados
         print("🔍 Aplicando inferencia de eventos basada en recursos...")
-        eventos_inferidos = 0
-        
-        # Preparamos columnas temporales para cálculos eficientes
-        insumos_cols_map = {
-            'KIT_A': 'KIT_A', 'KIT_B': 'KIT_B',
-            'CHAPA_FIBROCEMENTO': 'CHAPA_FIBROCEMENTO', 'CHAPA_ZINC': 'CHAPA_ZINC',
-            'COLCHONES': 'COLCHONES', 'FRAZADAS': 'FRAZADAS', 
-            'TERCIADAS': 'TERCIADAS', 'PUNTALES': 'PUNTALES', 'CARPAS_PLASTICAS': 'CARPAS_PLASTICAS'
-        }
-        
-        # Mapeamos columnas originales a versiones temporales limpias
-        temp_col_map = {}
-        for final_col, _ in insumos_cols_map.items():
-            found_col = next((col for col in df.columns if col == final_col), None)
-            if found_col:
-                df[f'{final_col}_TEMP'] = df[found_col].apply(self.limpiar_numero)
-                temp_col_map[final_col] = f'{final_col}_TEMP'
-            else:
-                df[f'{final_col}_TEMP'] = 0
-                temp_col_map[final_col] = f'{final_col}_TEMP'
-
-        # Aplicamos inferencia a cada registro
-        for idx, row in df.iterrows():
-            temp_row = row.to_dict()
-            for final_col, temp_col in temp_col_map.items():
-                temp_row[final_col.replace('_', ' ')] = row[temp_col]
 
-            evento_original = row['EVENTO']
-            evento_inferido = self.post_process_eventos_with_aids(temp_row)
+        # Convertimos una sola vez todas las columnas de insumos a enteros
+        insumos = self._coerce_insumos(df)
 
-            if evento_original != evento_inferido:
-                eventos_inferidos += 1
-                df.at[idx, 'EVENTO'] = evento_inferido
+        # Aplicamos inferencia a todos los registros de una vez
+        evento_original = df['EVENTO'].to_numpy(dtype=object)
+        evento_inferido = self.post_process_eventos_with_aids(
+            evento_original, df.get('DEPARTAMENTO', pd.Series('', index=df.index)), insumos
+        )
+        eventos_inferidos = int((evento_inferido != evento_original).sum())
+        df['EVENTO'] = evento_inferido
 
         print(f"  Eventos inferidos/ajustados: {eventos_inferidos}")
         # Distribution prints for EVENTO (pre/post inference) suppressed to reduce noisy console output
-        
-        # Limpiamos columnas temporales
-        cols_to_drop = [f'{col}_TEMP' for col in insumos_cols_map.keys() if f'{col}_TEMP' in df.columns]
-        df = df.drop(columns=cols_to_drop, errors='ignore')
 
         # 4. Filtramos registros que no deben ir al Data Warehouse
         registros_antes = len(df)
         print(f"  Registros antes de eliminación: {registros_antes}")
 
-        # Limpiamos números en columnas de insumos
-        for col in insumos_cols_map.keys():
-            df[col] = df.get(col, pd.Series([0] * len(df), index=df.index)).apply(self.limpiar_numero)
+        # Dejamos los números de insumos ya limpios
+        for col in _INSUMOS_COLS:
+            df[col] = insumos[col]
 
-        # Calculamos total de insumos por registro
-        insumo_cols = list(insumos_cols_map.keys())
-        df['TOTAL_INSUMOS'] = df[insumo_cols].sum(axis=1)
+        # Calculamos total de insumos por registro directamente sobre el bloque
+        # de enteros, sin agregar y luego borrar una columna auxiliar
+        total_insumos = insumos[_INSUMOS_COLS].to_numpy(dtype=np.int64).sum(axis=1)
 
         # 4a. Eliminamos registros de preposicionamiento
-        registros_eliminados_prepos = int((df['EVENTO'] == 'ELIMINAR_REGISTRO').sum())
-        df_limpio = df[df['EVENTO'] != 'ELIMINAR_REGISTRO'].copy()
+        eliminar = (df['EVENTO'] == 'ELIMINAR_REGISTRO').to_numpy()
+        registros_eliminados_prepos = int(eliminar.sum())
         print(f"  Registros marcados ELIMINAR_REGISTRO: {registros_eliminados_prepos}")
 
         # 4b. Eliminamos registros sin insumos
-        registros_sin_insumos = int((df_limpio['TOTAL_INSUMOS'] <= 0).sum()) if 'TOTAL_INSUMOS' in df_limpio.columns else 0
-        df_limpio = df_limpio[df_limpio['TOTAL_INSUMOS'] > 0]
+        registros_sin_insumos = int((total_insumos[~eliminar] <= 0).sum())
+        conservadas = ~eliminar & (total_insumos > 0)
         registros_eliminados_cero = registros_sin_insumos
         print(f"  Registros sin insumos (TOTAL_INSUMOS<=0): {registros_sin_insumos}")
 
-        df = df_limpio.drop(columns=['TOTAL_INSUMOS'], errors='ignore')
+        df = df[conservadas].copy()
+
+        # Reutilizamos la fecha ya parseada en el diagnóstico para las filas que quedan
+        if fechas_parseadas is not None:
+            fechas_parseadas = fechas_parseadas.to_numpy()[conservadas]
 
         print(f"  Registros eliminados (Preposicionamiento): {registros_eliminados_prepos:,}")
         print(f"  Registros eliminados (Sin insumos): {registros_eliminados_cero:,}")
         print(f"  Registros restantes: {len(df):,}")
 
         # 5. Creamos características adicionales para análisis
-        df = self.feature_engineering_basico(df)
+        df = self.feature_engineering_basico(df, fechas=fechas_parseadas)
 
         # 6. Aseguramos el formato final para el Data Warehouse
         df = self.estandarizacion_final_columnas(df)
 
         return df
 
-    def feature_engineering_basico(self, df):
+    def feature_engineering_basico(self, df, fechas=None):
         """Crea características adicionales que facilitan el análisis.
         
         Estas características nuevas ayudan a hacer agrupamientos y filtros
         en los dashboards y reportes del Data Warehouse.
+
+        Si la columna de fecha ya se parseó antes, `fechas` trae ese resultado
+        (alineado por posición con df) y no se vuelve a parsear.
         """
         # Buscamos la columna de fecha (puede tener diferentes nombres)
         fecha_cols = [col for col in df.columns if 'FECHA' in col.upper()]
@@ -1474,7 +1919,10 @@ class DataCleaner:
             col_fecha = fecha_cols[0]
 
             # Intentamos parsear las fechas de manera flexible
-            df[col_fecha] = pd.to_datetime(df[col_fecha], errors='coerce', dayfirst=True, infer_datetime_format=True)
+            if fechas is not None and len(fechas) == len(df):
+                df[col_fecha] = fechas
+            else:
+                df[col_fecha] = _parsear_fechas(df[col_fecha])
 
             # Si hay fechas que no pudimos parsear, intentamos estrategias alternativas
             n_invalid_fecha = int(df[col_fecha].isna().sum())
@@ -1482,48 +1930,32 @@ class DataCleaner:
                 print(f"  Nota: {n_invalid_fecha} filas inicialmente no parsearon como fecha. Aplicando heurísticas de recuperación...")
 
                 # Estrategia A: Detectar números de Excel (fechas como números seriales)
-                def try_excel_serial(val):
-                    try:
-                        if pd.isna(val):
-                            return None
-                        if isinstance(val, (int, float)) and val > 1000:
-                            return (pd.to_datetime('1899-12-30') + pd.to_timedelta(int(val), unit='D'))
-                        if isinstance(val, str) and re.fullmatch(r"\d+", val.strip()):
-                            iv = int(val.strip())
-                            if iv > 1000:
-                                return (pd.to_datetime('1899-12-30') + pd.to_timedelta(iv, unit='D'))
-                    except Exception:
-                        return None
-                    return None
-
-                mask_nat = df[col_fecha].isna()
+                mask_nat = df[col_fecha].isna().to_numpy()
                 if mask_nat.any():
-                    recovered = 0
-                    for idx in df[mask_nat].index:
-                        orig = df.at[idx, col_fecha]
-                        alt = try_excel_serial(orig)
-                        if alt is not None:
-                            df.at[idx, col_fecha] = alt
-                            recovered += 1
+                    fechas = df[col_fecha].to_numpy(copy=True)
+                    alt = _fechas_desde_serial_excel(fechas[mask_nat])
+                    ok = ~pd.isna(alt)
+                    recovered = int(ok.sum())
                     if recovered > 0:
+                        fechas[np.flatnonzero(mask_nat)[ok]] = alt[ok]
+                        df[col_fecha] = fechas
                         print(f"    Recuperadas {recovered} fechas desde seriales de Excel.")
 
                 # Estrategia B: Construir fecha desde columnas de año y mes separadas
-                mask_nat = df[col_fecha].isna()
+                mask_nat = df[col_fecha].isna().to_numpy()
                 year_cols = [c for c in df.columns if c.upper() in ('AÑO', 'ANO', 'ANIO', 'YEAR')]
                 month_cols = [c for c in df.columns if c.upper() in ('MES', 'MONTH', 'MES_NOMBRE')]
                 if mask_nat.any() and year_cols and month_cols:
-                    recovered_ym = 0
-                    for idx in df[mask_nat].index:
-                        try:
-                            y = int(df.at[idx, year_cols[0]])
-                            m = int(df.at[idx, month_cols[0]])
-                            if y > 1900 and 1 <= m <= 12:
-                                df.at[idx, col_fecha] = pd.Timestamp(year=y, month=m, day=1)
-                                recovered_ym += 1
-                        except Exception:
-                            continue
+                    fechas = df[col_fecha].to_numpy(copy=True)
+                    alt = _fechas_desde_anio_mes(
+                        df[year_cols[0]].to_numpy()[mask_nat],
+                        df[month_cols[0]].to_numpy()[mask_nat],
+                    )
+                    ok = ~pd.isna(alt)
+                    recovered_ym = int(ok.sum())
                     if recovered_ym > 0:
+                        fechas[np.flatnonzero(mask_nat)[ok]] = alt[ok]
+                        df[col_fecha] = fechas
                         print(f"    Reconstruidas {recovered_ym} fechas a partir de columnas AÑO/MES.")
 
                 # Reportamos cuántas fechas pudimos recuperar
@@ -1534,10 +1966,10 @@ class DataCleaner:
 
                 # Mostramos ejemplos de fechas que no pudimos parsear
                 if n_invalid_fecha_after > 0:
-                    sample_invalid = df[df[col_fecha].isna()].head(10)
+                    sample_invalid = df.loc[df[col_fecha].isna(), col_fecha].head(10)
                     print("  Ejemplos de valores de FECHA no parseados (primeros 10):")
-                    for i, r in sample_invalid.iterrows():
-                        print(f"    idx={i} valor_original={repr(r.get(col_fecha))}")
+                    for i, valor in sample_invalid.items():
+                        print(f"    idx={i} valor_original={repr(valor)}")
 
             # Eliminamos filas sin fecha válida (no se pueden analizar temporalmente)
             final_invalid = int(df[col_fecha].isna().sum())
@@ -1558,7 +1990,8 @@ class DataCleaner:
 
         # Agregamos orden de departamento para visualizaciones consistentes
         if 'DEPARTAMENTO' in df.columns:
-            df['ORDEN_DEPARTAMENTO'] = df['DEPARTAMENTO'].map(self.departamento_orden).fillna(0).astype(int)
+            codigos = pd.Categorical(df['DEPARTAMENTO'], dtype=self._dept_cat).codes
+            df['ORDEN_DEPARTAMENTO'] = self._orden_por_codigo[codigos]
 
         return df
 
@@ -1567,14 +2000,20 @@ class DataCleaner:
         
         Esta función garantiza que todas las columnas necesarias estén presentes
         y en el formato correcto, listas para ser cargadas en las tablas del DW.
+
+        Las columnas de texto salen como categóricas: DEPARTAMENTO y DISTRITO
+        sobre el vocabulario oficial (más los valores extra que haya en los
+        datos), LOCALIDAD y EVENTO con las categorías que aparecen. Para
+        asignarles un valor que no sea una de sus categorías hay que agregarlo
+        antes con cat.add_categories o pasar la columna a object.
         """
         # Definimos exactamente qué columnas y formatos espera el Data Warehouse
         columnas_finales = {
             'FECHA': 'datetime64[ns]',
-            'LOCALIDAD': 'object',
-            'DISTRITO': 'object',
-            'DEPARTAMENTO': 'object',
-            'EVENTO': 'object',
+            'LOCALIDAD': 'category',
+            'DISTRITO': 'category',
+            'DEPARTAMENTO': 'category',
+            'EVENTO': 'category',
             'KIT_B': 'int64',
             'KIT_A': 'int64',
             'CHAPA_FIBROCEMENTO': 'int64',
@@ -1589,25 +2028,55 @@ class DataCleaner:
             'ORDEN_DEPARTAMENTO': 'int64'
         }
 
-        # Construimos el DataFrame final con todas las columnas esperadas
-        df_final = pd.DataFrame()
+        # Preparamos cada columna ya con su tipo y armamos el DataFrame final de una vez
+        columnas = {}
         for col, dtype in columnas_finales.items():
             # Si la columna no existe, la creamos con valores por defecto
             if col not in df.columns:
                 if dtype in ['int64', 'float64']:
-                    df_final[col] = 0
+                    columnas[col] = pd.Series(0, index=df.index, dtype=dtype)
+                elif dtype == 'datetime64[ns]':
+                    columnas[col] = pd.Series(pd.NaT, index=df.index, dtype=dtype)
                 else:
-                    df_final[col] = 'SIN ESPECIFICAR'
+                    columnas[col] = pd.Series('SIN ESPECIFICAR', index=df.index, dtype='object')
             else:
                 # Si existe, la copiamos y aplicamos la limpieza según el tipo
                 if dtype in ['int64', 'float64']:
-                    df_final[col] = df[col].apply(self.limpiar_numero)
-                elif dtype == 'object':
-                    df_final[col] = df[col].apply(self.limpiar_texto)
+                    columnas[col] = self.limpiar_numero_serie(df[col]).astype(dtype)
+                elif dtype in ['object', 'category']:
+                    # Las categóricas se limpian como texto y se convierten al final
+                    columnas[col] = self.limpiar_texto_serie(df[col])
                 elif dtype == 'datetime64[ns]':
-                    df_final[col] = pd.to_datetime(df[col], errors='coerce')
+                    # pandas 3 elige la resolución según la entrada; la fijamos a la del
+                    # esquema, y lo que no entra en nanosegundos queda NaT como antes
+                    fechas = pd.to_datetime(df[col], errors='coerce')
+                    fuera = (fechas < pd.Timestamp.min) | (fechas > pd.Timestamp.max)
+                    columnas[col] = fechas.mask(fuera).astype(dtype)
+
+        df_final = pd.concat(columnas, axis=1)
+
+        # Departamento y distrito quedan como categóricos sobre el vocabulario oficial
+        df_final['DEPARTAMENTO'] = self._como_categoria(df_final['DEPARTAMENTO'], self._dept_cat)
+        df_final['DISTRITO'] = self._como_categoria(df_final['DISTRITO'], self._distrito_cat)
+        # Localidad y evento no tienen un vocabulario cerrado: las categorías salen de los datos
+        for col in ('LOCALIDAD', 'EVENTO'):
+            df_final[col] = df_final[col].astype('category')
+
+        return df_final
 
-        return df_final.astype(columnas_finales, errors='ignore')
+    def _como_categoria(self, serie, dtype):
+        """Convierte una columna de texto al tipo categórico dado sin perder valores.
+
+        Los valores que no forman parte del vocabulario oficial (por ejemplo
+        'SIN ESPECIFICAR' o un distrito que no se pudo corregir) se agregan
+        como categorías extra al final en lugar de convertirse en nulos.
+        """
+        extras = sorted(set(serie.dropna().unique()) - set(dtype.categories))
+        categorias = list(dtype.categories) + extras
+        return pd.Series(
+            pd.Categorical(serie, categories=categorias, ordered=dtype.ordered),
+            index=serie.index, name=serie.name
+        )
 
     def verificacion_final(self, df):
         """Revisa que todo esté correcto antes de enviar los datos al Data Warehouse.
@@ -1645,7 +2114,10 @@ class DataCleaner:
 
         # Verificamos localidades
         if 'LOCALIDAD' in df.columns:
+            # Sobre una columna categórica value_counts cuenta con los códigos, pero
+            # también lista las categorías sin filas: esas no son localidades finales
             localidades_finales = df['LOCALIDAD'].value_counts()
+            localidades_finales = localidades_finales[localidades_finales > 0]
             print(f"✅ LOCALIDADES FINALES: {len(localidades_finales)}")
             print("📊 Top 10 localidades más comunes:")
             for localidad, count in localidades_finales.head(10).items():
@@ -1654,6 +2126,7 @@ class DataCleaner:
         # Verificamos eventos
         if 'EVENTO' in df.columns:
             eventos_finales = df['EVENTO'].value_counts()
+            eventos_finales = eventos_finales[eventos_finales > 0]
             print(f"✅ EVENTOS FINALES: {len(eventos_finales)}")
             print("📊 Distribución Top 10:")
             for evento, count in eventos_finales.head(10).items():